@@ -1,22 +1,50 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-
-from .db import Base, engine
-from . import models
-from .routers import emi, leads, appointments, funds, sip, chat
 from dotenv import load_dotenv
 load_dotenv()
 
+import asyncio
+import math
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+
+from .db import engine
+from .routers import emi, leads, appointments, funds, sip, goals, chat, health, metrics, profiles
+from .services.admission import AdmissionMiddleware
+from .services.circuit import CircuitOpenError
+from .services.fund_metrics import refresh_fund_metrics_periodically
+from .services.goals import shutdown_pool
+from .services.metrics import MetricsMiddleware, instrument_engine, track_route
+from .services.profiling import ProfilingMiddleware
+from .services.warmup import run_warmup
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # DB tables, heavy imports and the LLM client are initialised in the
+    # background; /readyz reports when they're done.
+    warmup_task = asyncio.create_task(run_warmup())
+    # Screener metrics index, refreshed incrementally (FUND_METRICS_REFRESH_SECONDS)
+    metrics_task = asyncio.create_task(refresh_fund_metrics_periodically(wait_for=warmup_task))
+    yield
+    metrics_task.cancel()
+    warmup_task.cancel()
+    shutdown_pool()
 
-# Create DB tables
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="Finance Bot Backend",
     description="EMI + Mutual Fund + Lead + SIP",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
+    dependencies=[Depends(track_route)],
 )
 
+# Per-client rate limits + separate LLM / compute concurrency pools.
+# Innermost, so CORS headers and metrics still cover 429/503 responses.
+app.add_middleware(AdmissionMiddleware)
+
 # CORS (adjust origins when you build frontend)
 app.add_middleware(
     CORSMiddleware,
@@ -26,33 +54,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in per-request profiling (admin header or PROFILE_SAMPLE_RATE)
+app.add_middleware(ProfilingMiddleware)
+
+# Per-route latency / status / DB metrics (outermost, so it sees everything)
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+
 # Include routers
+app.include_router(health.router)
+app.include_router(metrics.router)
+app.include_router(profiles.router)
 app.include_router(emi.router)
 app.include_router(leads.router)
 app.include_router(appointments.router)
 app.include_router(funds.router)
 app.include_router(sip.router)
+app.include_router(goals.router)
 app.include_router(chat.router)
 
 
+@app.exception_handler(CircuitOpenError)
+async def upstream_unavailable(request: Request, exc: CircuitOpenError):
+    # an upstream is down and we had nothing cached to serve instead
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_in)))},
+    )
+
+
 @app.get("/")
 def root():
     return {"message": "Finance Bot Backend is running"}
-
-import requests
-
-@app.on_event("startup")
-def warm_llm():
-    try:
-        requests.post(
-            "http://localhost:11434/api/chat",
-            json={
-                "model": "llama3",
-                "messages": [{"role": "user", "content": "warmup"}],
-                "stream": False
-            },
-            timeout=5
-        )
-    except:
-        pass
-
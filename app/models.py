@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -33,4 +33,32 @@ class Appointment(Base):
     notes = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    lead = relationship("Lead", back_populates="appointments")
\ No newline at end of file
+    lead = relationship("Lead", back_populates="appointments")
+
+
+class FundMetrics(Base):
+    """
+    Precomputed per-scheme screening metrics (see services/fund_metrics.py).
+    Percent values throughout, e.g. cagr_3y=14.2 means 14.2% p.a.
+    """
+    __tablename__ = "fund_metrics"
+
+    scheme_code = Column(String, primary_key=True)
+    scheme_name = Column(String, nullable=False)
+    fund_house = Column(String, nullable=True)
+    scheme_category = Column(String, nullable=True)  # raw mfapi meta, e.g. "Equity Scheme - Flexi Cap Fund"
+    asset_class = Column(String, index=True)  # e.g. "equity", "debt", "hybrid"
+    category = Column(String, index=True)  # e.g. "flexi cap", "liquid"
+
+    last_nav_date = Column(Date, index=True)
+    latest_nav = Column(Float)
+    history_years = Column(Float)
+
+    cagr_1y = Column(Float, index=True)
+    cagr_3y = Column(Float, index=True)
+    cagr_5y = Column(Float, index=True)
+    volatility = Column(Float, index=True)  # annualised, last 3 years
+    max_drawdown = Column(Float, index=True)  # last 5 years, <= 0
+    sip_return_3y = Column(Float, index=True)  # median rolling 3y SIP IRR, p.a.
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from ..db import get_db
 from .. import models, schemas
+from ..services.export import export_table
 
 router = APIRouter(prefix="/appointments", tags=["Appointments"])
 
@@ -35,3 +37,23 @@ def create_appointment(
 def list_appointments(db: Session = Depends(get_db)):
     appts = db.query(models.Appointment).order_by(models.Appointment.created_at.desc()).all()
     return appts
+
+
+@router.get("/export")
+def export_appointments(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    since: Optional[int] = Query(None, ge=0, description="Only rows with id > since"),
+):
+    """
+    Streams all appointments as CSV or NDJSON for the CRM sync.
+    Pass the returned X-Export-Cursor as `since` on the next run.
+    """
+    body, media_type, cursor = export_table(models.Appointment.__table__, format, since)
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={
+            "X-Export-Cursor": str(cursor),
+            "Content-Disposition": f'attachment; filename="appointments.{format}"',
+        },
+    )
@@ -1,14 +1,16 @@
 from fastapi import APIRouter, HTTPException
 from ..schemas import ChatRequest, ChatResponse
+from functools import lru_cache
 import json
 import os
-import requests
 
 # ============================================================
-#  LLM SELECTION (GROQ FOR CLOUD)
+#  LLM SELECTION (LLM_PROVIDER env, GROQ FOR CLOUD)
 # ============================================================
 
-from ..services.llm_groq import call_llm_groq as call_llm
+from ..services.chat_sessions import CHAT_SESSION_STORE, INTENT_PARAMS, ChatSession
+from ..services.llm_provider import call_llm
+from ..services.metrics import track_upstream
 
 router = APIRouter(prefix="/chat", tags=["Chat / LLM"])
 
@@ -18,6 +20,7 @@ INTERNAL_BASE = os.getenv("INTERNAL_BASE_URL", "http://127.0.0.1:8000")
 #  SYSTEM PROMPTS
 # ============================================================
 
+@lru_cache(maxsize=None)
 def base_prompt() -> str:
     return (
         "You are NiveshBuddy, a modern Indian personal finance assistant.\n"
@@ -32,6 +35,7 @@ def base_prompt() -> str:
     )
 
 
+@lru_cache(maxsize=None)
 def intent_prompt() -> str:
     return (
         "You are a JSON-only intent extractor.\n\n"
@@ -70,7 +74,7 @@ def calculate_sip_budget(income: float) -> int:
 
 
 def call_emi_api(parsed):
-    if not all([parsed["loan_amount"], parsed["interest_rate"], parsed["tenure_years"]]):
+    if not all([parsed.get("loan_amount"), parsed.get("interest_rate"), parsed.get("tenure_years")]):
         return None
 
     payload = {
@@ -79,16 +83,19 @@ def call_emi_api(parsed):
         "tenure_years": parsed["tenure_years"],
     }
 
+    import requests
+
     try:
-        r = requests.post(f"{INTERNAL_BASE}/emi/calculate", json=payload, timeout=10)
-        r.raise_for_status()
+        with track_upstream("internal_emi"):
+            r = requests.post(f"{INTERNAL_BASE}/emi/calculate", json=payload, timeout=10)
+            r.raise_for_status()
         return r.json()
     except:
         return None
 
 
 def call_sip_api(parsed):
-    if not all([parsed["monthly_amount"], parsed["years"]]):
+    if not all([parsed.get("monthly_amount"), parsed.get("years")]):
         return None
 
     payload = {
@@ -98,104 +105,134 @@ def call_sip_api(parsed):
         "use_nav_history": True,
     }
 
+    import requests
+
     try:
-        r = requests.post(f"{INTERNAL_BASE}/sip/calculate", json=payload, timeout=15)
-        r.raise_for_status()
+        with track_upstream("internal_sip"):
+            r = requests.post(f"{INTERNAL_BASE}/sip/calculate", json=payload, timeout=15)
+            r.raise_for_status()
         return r.json()
     except:
         return None
 
 
-def run_intent_detection(message: str) -> dict:
+def run_intent_detection(message: str, session: ChatSession) -> dict:
+    system = intent_prompt()
+    if session.last_intent in INTENT_PARAMS:
+        # lets follow-ups like "what about 15 years instead?" keep their intent
+        system += (
+            f"\nThe previous intent was {session.last_intent} with "
+            f"{json.dumps(session.params.get(session.last_intent, {}))}. "
+            "If this message only changes some of those values, keep that intent "
+            "and return just the values it mentions.\n"
+        )
     try:
         raw = call_llm([
-            {"role": "system", "content": intent_prompt()},
+            {"role": "system", "content": system},
             {"role": "user", "content": message}
         ])
         return json.loads(raw)
     except:
         return {"intent": "general"}
 
+
+def respond(session: ChatSession, instructions: str, message: str) -> str:
+    """
+    One LLM call with the session's bounded history in front of the new
+    message; prompt size stays flat however long the conversation runs.
+    """
+    system = base_prompt() + instructions
+    note = session.context_note()
+    if note:
+        system += "\n" + note
+    return call_llm(
+        [{"role": "system", "content": system}]
+        + session.history()
+        + [{"role": "user", "content": message}]
+    )
+
 # ============================================================
 #  MAIN CHAT ENDPOINT
 # ============================================================
 
+def handle_message(session: ChatSession, message: str) -> str:
+    parsed = run_intent_detection(message, session)
+    intent = parsed.get("intent", "general")
+    # merged with what earlier turns established for the same intent
+    params = session.remember(intent, parsed) if intent in INTENT_PARAMS else {}
+
+    # ---------------- EMI ----------------
+    if intent == "emi":
+        emi_data = call_emi_api(params)
+
+        if not emi_data:
+            return respond(session, "Ask politely for loan amount, interest rate (annual), and tenure in years.", message)
+
+        return respond(
+            session,
+            f"Explain this EMI result in simple English:\n{emi_data}\n"
+            "Do not show formulas or JSON. Keep it clear and short.",
+            message,
+        )
+
+    # ---------------- SIP ----------------
+    if intent == "sip":
+        income = safe_float(parsed.get("income"))
+
+        if income:
+            sip_budget = calculate_sip_budget(income)
+            return respond(
+                session,
+                f"The user's income is ₹{income}. "
+                f"Suggest SIP budget around ₹{sip_budget}. "
+                "Recommend diversified mutual fund categories (not NAVs). "
+                "Mention Direct plans. No specific guarantees.",
+                message,
+            )
+
+        sip_data = call_sip_api(params)
+        if sip_data:
+            return respond(
+                session,
+                f"Explain this SIP outcome clearly:\n{sip_data}\n"
+                "Focus on long-term investing benefits.",
+                message,
+            )
+
+        return respond(session, "Ask politely for monthly SIP amount and investment duration.", message)
+
+    # ----------- MUTUAL FUND INFO ----------
+    if intent == "mutual_fund_info":
+        return respond(
+            session,
+            "Explain this mutual fund in an educational way. "
+            "Do not recommend buying or selling. "
+            "Explain category, suitability, and risks.",
+            message,
+        )
+
+    # ---------------- GENERAL --------------
+    return respond(session, "", message)
+
+
 @router.post("/", response_model=ChatResponse)
 def chat(payload: ChatRequest):
-    try:
-        parsed = run_intent_detection(payload.message)
-        intent = parsed.get("intent", "general")
-
-        # ---------------- EMI ----------------
-        if intent == "emi":
-            emi_data = call_emi_api(parsed)
-
-            if not emi_data:
-                reply = call_llm([
-                    {"role": "system", "content": base_prompt() +
-                     "Ask politely for loan amount, interest rate (annual), and tenure in years."},
-                    {"role": "user", "content": payload.message}
-                ])
-                return ChatResponse(reply=reply)
-
-            explanation = call_llm([
-                {"role": "system", "content": base_prompt() +
-                 f"Explain this EMI result in simple English:\n{emi_data}\n"
-                 "Do not show formulas or JSON. Keep it clear and short."},
-                {"role": "user", "content": payload.message}
-            ])
-            return ChatResponse(reply=explanation)
-
-        # ---------------- SIP ----------------
-        if intent == "sip":
-            income = safe_float(parsed.get("income"))
-
-            if income:
-                sip_budget = calculate_sip_budget(income)
-                reply = call_llm([
-                    {"role": "system", "content": base_prompt() +
-                     f"The user's income is ₹{income}. "
-                     f"Suggest SIP budget around ₹{sip_budget}. "
-                     "Recommend diversified mutual fund categories (not NAVs). "
-                     "Mention Direct plans. No specific guarantees."},
-                    {"role": "user", "content": payload.message}
-                ])
-                return ChatResponse(reply=reply)
-
-            sip_data = call_sip_api(parsed)
-            if sip_data:
-                explanation = call_llm([
-                    {"role": "system", "content": base_prompt() +
-                     f"Explain this SIP outcome clearly:\n{sip_data}\n"
-                     "Focus on long-term investing benefits."},
-                    {"role": "user", "content": payload.message}
-                ])
-                return ChatResponse(reply=explanation)
-
-            reply = call_llm([
-                {"role": "system", "content": base_prompt() +
-                 "Ask politely for monthly SIP amount and investment duration."},
-                {"role": "user", "content": payload.message}
-            ])
-            return ChatResponse(reply=reply)
-
-        # ----------- MUTUAL FUND INFO ----------
-        if intent == "mutual_fund_info":
-            reply = call_llm([
-                {"role": "system", "content": base_prompt() +
-                 "Explain this mutual fund in an educational way. "
-                 "Do not recommend buying or selling. "
-                 "Explain category, suitability, and risks."},
-                {"role": "user", "content": payload.message}
-            ])
-            return ChatResponse(reply=reply)
-
-        # ---------------- GENERAL --------------
-        final_reply = call_llm([
-            {"role": "system", "content": base_prompt()},
-            {"role": "user", "content": payload.message}
-        ])
-        return ChatResponse(reply=final_reply)
+    session = CHAT_SESSION_STORE.get_or_create(payload.session_id)
+
+    with session.lock:
+        try:
+            reply = handle_message(session, payload.message)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+        session.add_turn("user", payload.message)
+        session.add_turn("assistant", reply)
+
+    return ChatResponse(reply=reply, session_id=session.session_id)
+
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+@router.delete("/sessions/{session_id}")
+def clear_session(session_id: str):
+    if not CHAT_SESSION_STORE.delete(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"message": "Session cleared"}
@@ -1,8 +1,83 @@
-from fastapi import APIRouter, HTTPException
+from datetime import date, timedelta
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from ..db import get_db
+from .. import models, schemas
+from ..services.circuit import CircuitOpenError
+from ..services.fund_metrics import normalize_category
 from ..services.mfapi import get_scheme_data
+from ..services.scheme_search import search_schemes
 
 router = APIRouter(prefix="/funds", tags=["Mutual Funds"])
 
+SCREEN_SORT_FIELDS = {
+    "cagr_1y", "cagr_3y", "cagr_5y", "volatility", "max_drawdown", "sip_return_3y",
+}
+
+
+@router.get("/screen", response_model=List[schemas.FundMetricsResponse])
+def screen_funds(
+    category: Optional[str] = Query(None, description='e.g. "flexi cap", "liquid"'),
+    asset_class: Optional[str] = Query(None, description='e.g. "equity", "debt", "hybrid"'),
+    sort_by: str = Query("cagr_3y"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    max_volatility: Optional[float] = None,
+    min_max_drawdown: Optional[float] = Query(None, description="e.g. -15 keeps funds that never fell more than 15%"),
+    min_history_years: Optional[float] = None,
+    max_nav_age_days: int = Query(30, ge=0, description="hide schemes with no NAV for this long (0 = keep all)"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """
+    Filters and ranks schemes by precomputed metrics (no upstream calls).
+    """
+    if sort_by not in SCREEN_SORT_FIELDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"sort_by must be one of: {', '.join(sorted(SCREEN_SORT_FIELDS))}"
+        )
+
+    FM = models.FundMetrics
+    sort_column = getattr(FM, sort_by)
+    query = db.query(FM).filter(sort_column.isnot(None))
+
+    if category:
+        query = query.filter(FM.category == normalize_category(category))
+    if asset_class:
+        query = query.filter(FM.asset_class == asset_class.strip().lower())
+    if max_volatility is not None:
+        query = query.filter(FM.volatility <= max_volatility)
+    if min_max_drawdown is not None:
+        query = query.filter(FM.max_drawdown >= min_max_drawdown)
+    if min_history_years is not None:
+        query = query.filter(FM.history_years >= min_history_years)
+    if max_nav_age_days:
+        query = query.filter(FM.last_nav_date >= date.today() - timedelta(days=max_nav_age_days))
+
+    query = query.order_by(sort_column.desc() if order == "desc" else sort_column.asc())
+    return query.limit(limit).all()
+
+
+@router.get("/search", response_model=List[schemas.SchemeSearchResult])
+async def search_funds(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    hide_regular: bool = False,
+    hide_idcw: bool = False,
+):
+    """
+    Typeahead: top matches for a (partial) scheme name, with scores.
+    """
+    try:
+        return await search_schemes(q, limit, hide_regular, hide_idcw)
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Error loading scheme list: {e}")
+
 
 @router.get("/{scheme_code}")
 async def get_fund(scheme_code: str):
@@ -12,5 +87,7 @@ async def get_fund(scheme_code: str):
     try:
         data = await get_scheme_data(scheme_code)
         return data
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Error fetching scheme data: {e}")
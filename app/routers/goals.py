@@ -0,0 +1,23 @@
+from fastapi import APIRouter, HTTPException
+
+from ..schemas import GoalSimInput, GoalSimResult
+from ..services.circuit import CircuitOpenError
+from ..services.goals import simulate_goal
+
+router = APIRouter(prefix="/goals", tags=["Goal Planning"])
+
+
+@router.post("/simulate", response_model=GoalSimResult)
+async def simulate(payload: GoalSimInput):
+    """
+    Monte Carlo SIP projection bootstrapped from historical NAV returns:
+    percentile bands per year and the probability of reaching goal_amount.
+    """
+    try:
+        return await simulate_goal(payload)
+    except CircuitOpenError:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Goal simulation failed: {str(e)}")
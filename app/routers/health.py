@@ -0,0 +1,34 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from ..services.circuit import BREAKERS
+from ..services.warmup import WARMUP_STATUS, is_ready
+
+router = APIRouter(tags=["Health"])
+
+
+@router.get("/healthz")
+def liveness():
+    """
+    Process is up and the event loop is responsive.
+    """
+    return {"status": "alive"}
+
+
+@router.get("/readyz")
+def readiness():
+    """
+    503 until the DB is ready and the optional warmups (caches, LLM
+    client) have finished or run past WARMUP_OPTIONAL_TIMEOUT_SECONDS.
+    Upstream circuit state is reported but doesn't affect readiness:
+    we keep serving cached data while mfapi is down.
+    """
+    ready = is_ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "warming",
+            "components": WARMUP_STATUS,
+            "upstreams": {name: breaker.snapshot() for name, breaker in BREAKERS.items()},
+        },
+    )
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from ..db import get_db
 from .. import models, schemas
+from ..services.export import export_table
 
 router = APIRouter(prefix="/leads", tags=["Leads"])
 
@@ -43,6 +45,26 @@ def create_lead(lead: schemas.LeadCreate, db: Session = Depends(get_db)):
     return db_lead
 
 
+@router.get("/export")
+def export_leads(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    since: Optional[int] = Query(None, ge=0, description="Only rows with id > since"),
+):
+    """
+    Streams all leads as CSV or NDJSON for the CRM sync.
+    Pass the returned X-Export-Cursor as `since` on the next run.
+    """
+    body, media_type, cursor = export_table(models.Lead.__table__, format, since)
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={
+            "X-Export-Cursor": str(cursor),
+            "Content-Disposition": f'attachment; filename="leads.{format}"',
+        },
+    )
+
+
 @router.get("/{lead_id}", response_model=schemas.LeadResponse)
 def get_lead(lead_id: int, db: Session = Depends(get_db)):
     lead = db.query(models.Lead).filter(models.Lead.id == lead_id).first()
@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..services.metrics import render_metrics
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Prometheus text exposition of request, upstream, DB and cache metrics.
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,39 @@
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from ..services.profiling import get_profile, is_authorized, list_profiles
+
+router = APIRouter(prefix="/profiles", tags=["Profiling"])
+
+
+def require_admin(token: Optional[str]):
+    if not is_authorized(token):
+        raise HTTPException(status_code=403, detail="Profiling is admin-only")
+
+
+@router.get("/")
+def get_profiles(x_profile_token: Optional[str] = Header(None)):
+    """
+    Most recent request profiles with their CPU vs I/O-wait breakdown.
+    """
+    require_admin(x_profile_token)
+    return list_profiles()
+
+
+@router.get("/{profile_id}", response_class=PlainTextResponse)
+def download_profile(profile_id: str, x_profile_token: Optional[str] = Header(None)):
+    """
+    Collapsed-stack artifact, ready for flamegraph.pl or speedscope.
+    """
+    require_admin(x_profile_token)
+
+    profile = get_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    return PlainTextResponse(
+        profile.collapsed(),
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.collapsed"'},
+    )
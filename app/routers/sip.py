@@ -1,8 +1,14 @@
-from fastapi import APIRouter, HTTPException
-from math import pow
+from fastapi import APIRouter, HTTPException, Query
 
-from ..schemas import SIPInput, SIPResult
-from ..services.sip import calculate_sip_formula, calculate_sip_nav_based
+from ..schemas import SIPGridInput, SIPGridResult, SIPInput, SIPResult, SIPRollingReturns
+from ..services.sip import (
+    calculate_rolling_sip_returns,
+    calculate_sip_grid,
+    calculate_sip_formula,
+    calculate_sip_nav_based,
+    sip_formula_xirr_percent,
+)
+from ..services.circuit import CircuitOpenError
 from ..services.scheme_lookup import find_scheme_code_by_name
 
 
@@ -25,6 +31,8 @@ async def calculate_sip(payload: SIPInput):
         try:
             match = await find_scheme_code_by_name(payload.scheme_name)
             payload.scheme_code = match["scheme_code"]
+        except CircuitOpenError:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=400,
@@ -46,6 +54,8 @@ async def calculate_sip(payload: SIPInput):
     try:
         if payload.use_nav_history:
             return await calculate_sip_nav_based(payload)
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -65,11 +75,7 @@ async def calculate_sip(payload: SIPInput):
         profit = value - invested
         absolute_return = (profit / invested * 100) if invested else 0
 
-        annual_return = (
-            (pow((value / invested), (1 / payload.years)) - 1) * 100
-            if invested > 0 and payload.years > 0
-            else 0
-        )
+        annual_return = sip_formula_xirr_percent(payload.monthly_amount, payload.years, value)
 
         # Placeholders since formula mode doesn’t use NAV or real units
         return SIPResult(
@@ -90,3 +96,45 @@ async def calculate_sip(payload: SIPInput):
             status_code=500,
             detail=f"Formula-based SIP failed: {str(e)}"
         )
+
+
+@router.get("/rolling-returns/{scheme_code}", response_model=SIPRollingReturns)
+async def rolling_sip_returns(
+    scheme_code: str,
+    months: int = Query(36, ge=6, le=240),
+    lookback_years: int = Query(5, ge=1, le=20),
+):
+    """
+    Distribution of SIP XIRRs for every start month in the lookback.
+    """
+    try:
+        return await calculate_rolling_sip_returns(scheme_code, months, lookback_years)
+    except CircuitOpenError:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Rolling SIP returns failed: {str(e)}")
+
+
+@router.post("/grid", response_model=SIPGridResult)
+def sip_grid(payload: SIPGridInput):
+    """
+    Formula-mode SIP for every amount × duration × expected return,
+    with optional annual step-up and an initial lumpsum.
+    """
+    grid = calculate_sip_grid(
+        payload.monthly_amounts,
+        payload.years,
+        payload.expected_returns,
+        payload.annual_step_up_percent,
+        payload.lumpsum_amount,
+    )
+    return SIPGridResult(
+        monthly_amounts=payload.monthly_amounts,
+        years=payload.years,
+        expected_returns=payload.expected_returns,
+        annual_step_up_percent=payload.annual_step_up_percent,
+        lumpsum_amount=payload.lumpsum_amount,
+        **grid,
+    )
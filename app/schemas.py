@@ -1,4 +1,5 @@
-from typing import List, Optional
+from datetime import date
+from typing import Annotated, List, Optional
 from pydantic import BaseModel, EmailStr, Field
 
 
@@ -120,6 +121,119 @@ class SIPResult(BaseModel):
     annual_return_percent: float
     total_units: float
     latest_nav: float
+    # true when mfapi was unreachable/slow and cached NAVs were used
+    stale: bool = False
+
+
+class SIPRollingReturns(BaseModel):
+    scheme_code: str
+    scheme_name: str
+    months: int
+    lookback_years: int
+
+    windows: int
+    min_percent: float
+    p25_percent: float
+    median_percent: float
+    p75_percent: float
+    max_percent: float
+    positive_percent: float
+    stale: bool = False
+
+
+# Per-item bounds keep every grid cell finite (100% p.a. over 50 years
+# with a 100% step-up is still well inside float64).
+class SIPGridInput(BaseModel):
+    monthly_amounts: List[Annotated[float, Field(ge=0, le=1e9)]] = Field(..., min_length=1, max_length=50)
+    years: List[Annotated[float, Field(gt=0, le=50)]] = Field(..., min_length=1, max_length=50)
+    expected_returns: List[Annotated[float, Field(ge=0, le=100)]] = Field(..., min_length=1, max_length=50)
+    annual_step_up_percent: float = Field(default=0.0, ge=0, le=100)
+    lumpsum_amount: float = Field(default=0.0, ge=0, le=1e12)
+
+
+class SIPGridResult(BaseModel):
+    monthly_amounts: List[float]
+    years: List[float]
+    expected_returns: List[float]
+    annual_step_up_percent: float
+    lumpsum_amount: float
+
+    # indexed [amount][years], and [amount][years][return] below
+    total_invested: List[List[float]]
+    future_value: List[List[List[float]]]
+    profit: List[List[List[float]]]
+    absolute_return_percent: List[List[List[float]]]
+    # per expected return (effective annual rate = XIRR of the schedule)
+    annual_return_percent: List[float]
+
+# ============================================================
+#                   GOAL PLANNING (Monte Carlo)
+# ============================================================
+
+class GoalSimInput(BaseModel):
+    scheme_codes: List[str] = Field(..., min_length=1, max_length=10)
+    weights: Optional[List[float]] = None  # defaults to equal weights
+
+    monthly_amount: float = Field(..., ge=0)
+    lumpsum_amount: float = Field(default=0.0, ge=0)
+    years: float = Field(..., gt=0, le=40)
+    goal_amount: float = Field(..., gt=0)
+
+    paths: int = Field(default=10000, ge=1000, le=1_000_000)
+    lookback_years: Optional[int] = Field(default=None, ge=2, le=30)
+    seed: Optional[int] = Field(default=None, ge=0)
+
+
+class GoalBand(BaseModel):
+    year: float
+    p10: float
+    p25: float
+    p50: float
+    p75: float
+    p90: float
+
+
+class GoalSimResult(BaseModel):
+    probability_of_success: float
+    goal_amount: float
+    total_invested: float
+    paths: int
+    seed: int
+    history_months: int
+    bands: List[GoalBand]
+    stale: bool = False
+
+# ============================================================
+#                   FUND SCREENER
+# ============================================================
+
+class SchemeSearchResult(BaseModel):
+    scheme_code: str
+    scheme_name: str
+    score: float
+
+
+class FundMetricsResponse(BaseModel):
+    scheme_code: str
+    scheme_name: str
+    fund_house: Optional[str] = None
+    asset_class: Optional[str] = None
+    category: Optional[str] = None
+    last_nav_date: Optional[date] = None
+    latest_nav: Optional[float] = None
+    history_years: Optional[float] = None
+
+    cagr_1y: Optional[float] = None
+    cagr_3y: Optional[float] = None
+    cagr_5y: Optional[float] = None
+    volatility: Optional[float] = None
+    max_drawdown: Optional[float] = None
+    sip_return_3y: Optional[float] = None
+
+    model_config = {
+        "from_attributes": True
+    }
+
 
 # ============================================================
 #                     CHAT / LLM SCHEMAS
@@ -131,7 +245,12 @@ class ChatRequest(BaseModel):
         default="general",
         description="one of: general, emi, sip"
     )
+    session_id: Optional[str] = Field(
+        default=None,
+        description="from a previous ChatResponse; omit to start a new conversation"
+    )
 
 
 class ChatResponse(BaseModel):
     reply: str
+    session_id: Optional[str] = None
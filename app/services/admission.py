@@ -0,0 +1,261 @@
+"""
+Admission control in front of the routers.
+
+Each request path maps to a pool ("llm" or "compute"); paths in neither
+(health, metrics, docs) are never held back. A request is admitted when:
+
+1. its client still has a token in that pool's per-client bucket
+   (otherwise 429), and
+2. the pool has a free slot, or one frees up within the pool's max queue
+   time (otherwise 503). Requests that clearly can't make it, because
+   the queue is full or its estimated drain time is past the deadline,
+   are turned away immediately instead of timing out in the queue.
+
+Both rejections carry Retry-After. Because the sync chat endpoint can
+hold at most the llm pool's slots, a chat surge can't take the whole
+worker thread pool from the cheap routes.
+"""
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+from .metrics import Counter, Gauge, Histogram
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "1") == "1"
+# Only behind a proxy that appends the caller's address to X-Forwarded-For
+# (e.g. Railway's edge) should the header be trusted; anything to the left
+# of the hops our proxies added is client-supplied and can be forged.
+# Off by default for local runs; start.sh (the Railway entrypoint) turns it
+# on with one trusted hop. Behind a proxy with trust off, every client
+# shares the proxy's bucket, i.e. the limits become a global throttle.
+ADMISSION_TRUST_FORWARDED = os.getenv("ADMISSION_TRUST_FORWARDED", "0") == "1"
+# Number of trusted proxies in front of the app; the client is the address
+# the outermost of them appended (the Nth hop from the right).
+ADMISSION_TRUSTED_HOPS = max(1, int(os.getenv("ADMISSION_TRUSTED_HOPS", "1")))
+ADMISSION_MAX_CLIENTS = int(os.getenv("ADMISSION_MAX_CLIENTS", "10000"))
+
+# pool -> path prefixes
+POOL_ROUTES = {
+    "llm": ("/chat",),
+    "compute": ("/goals", "/sip", "/funds", "/emi", "/leads", "/appointments"),
+}
+
+# Loopback peers (chat's internal /emi and /sip calls) skip the buckets
+# but still take pool slots. Checked against the socket peer only, never
+# against a forwarded address.
+_LOOPBACK = {"127.0.0.1", "::1", "localhost"}
+
+# pool -> (concurrency, max queued, max queue ms, client rate /s, client burst)
+# Override per pool, e.g. ADMISSION_LLM_CLIENT_RATE=0 disables its buckets.
+POOL_DEFAULTS = {
+    "llm": (8, 32, 3000, 0.5, 5),
+    "compute": (32, 256, 1000, 10.0, 40),
+}
+
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total", "Requests turned away by admission control.", ("pool", "reason")
+)
+ADMISSION_ACTIVE = Gauge("admission_active", "Requests holding a pool slot.", ("pool",))
+ADMISSION_QUEUED = Gauge("admission_queued", "Requests waiting for a pool slot.", ("pool",))
+ADMISSION_WAIT = Histogram("admission_wait_seconds", "Time spent queued for a pool slot.", ("pool",))
+
+
+def _env(pool: str, key: str, default):
+    return type(default)(os.getenv(f"ADMISSION_{pool.upper()}_{key}", str(default)))
+
+
+# --------------------------------------------------
+# Per-client token buckets
+# --------------------------------------------------
+class TokenBuckets:
+    """
+    `rate` tokens/second up to `burst`, one bucket per client.
+    Only touched from the event loop, so no lock.
+    """
+
+    def __init__(self, rate: float, burst: float, max_clients: int = ADMISSION_MAX_CLIENTS):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()  # client -> [tokens, updated]
+
+    def take(self, client: str) -> float:
+        """
+        0 when a token was taken, else seconds until one is available.
+        """
+        now = time.monotonic()
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = [self.burst, now]
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / self.rate
+
+
+# --------------------------------------------------
+# Concurrency pools
+# --------------------------------------------------
+class AdmissionPool:
+    def __init__(self, name: str, concurrency: int, max_queue: int, max_wait_ms: float, rate: float, burst: float):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait_ms / 1000
+        self.buckets = TokenBuckets(rate, burst) if rate > 0 else None
+
+        self.active = 0
+        self.waiting = 0
+        self.avg_service = 0.0  # EWMA of slot hold time, seconds
+        self._slots = asyncio.Semaphore(concurrency)
+
+    @classmethod
+    def from_env(cls, name: str) -> "AdmissionPool":
+        concurrency, max_queue, max_wait_ms, rate, burst = POOL_DEFAULTS[name]
+        return cls(
+            name,
+            _env(name, "CONCURRENCY", concurrency),
+            _env(name, "MAX_QUEUE", max_queue),
+            _env(name, "MAX_WAIT_MS", max_wait_ms),
+            _env(name, "CLIENT_RATE", rate),
+            _env(name, "CLIENT_BURST", burst),
+        )
+
+    def estimated_wait(self) -> float:
+        """
+        Rough time until a newly queued request gets a slot.
+        """
+        if self.active < self.concurrency and not self.waiting:
+            return 0.0
+        return (self.waiting + 1) * self.avg_service / self.concurrency
+
+    async def acquire(self) -> Optional[str]:
+        """
+        Takes a slot. Returns a rejection reason instead when the request
+        would have to queue past max_wait.
+        """
+        if self.waiting >= self.max_queue:
+            return "queue_full"
+        if self.estimated_wait() > self.max_wait:
+            return "deadline"
+
+        self.waiting += 1
+        ADMISSION_QUEUED.inc(self.name)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            return "deadline"
+        finally:
+            self.waiting -= 1
+            ADMISSION_QUEUED.dec(self.name)
+            ADMISSION_WAIT.observe(time.perf_counter() - start, self.name)
+
+        self.active += 1
+        ADMISSION_ACTIVE.inc(self.name)
+        return None
+
+    def release(self, held_s: float):
+        self.active -= 1
+        ADMISSION_ACTIVE.dec(self.name)
+        self.avg_service = held_s if not self.avg_service else 0.9 * self.avg_service + 0.1 * held_s
+        self._slots.release()
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.estimated_wait()))
+
+
+POOLS = {name: AdmissionPool.from_env(name) for name in POOL_ROUTES}
+
+
+def match_pool(path: str) -> Tuple[Optional[AdmissionPool], Optional[str]]:
+    """
+    (pool, matched prefix) for a request path, or (None, None).
+    """
+    for name, prefixes in POOL_ROUTES.items():
+        for prefix in prefixes:
+            if path == prefix or path.startswith(prefix + "/"):
+                return POOLS[name], prefix
+    return None, None
+
+
+def peer_address(scope) -> str:
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def client_id(scope) -> str:
+    """
+    Bucket key for the request: the socket peer, or with
+    ADMISSION_TRUST_FORWARDED the address our trusted proxies appended
+    to X-Forwarded-For. Client-supplied hops to the left are ignored.
+    """
+    if ADMISSION_TRUST_FORWARDED:
+        hops = []
+        for key, value in scope["headers"]:
+            if key == b"x-forwarded-for":
+                hops.extend(h.strip() for h in value.decode("latin-1").split(","))
+        hops = [h for h in hops if h]
+        if hops:
+            return hops[-min(ADMISSION_TRUSTED_HOPS, len(hops))]
+    return peer_address(scope)
+
+
+def _reject(status: int, retry_after: float, detail: str) -> JSONResponse:
+    return JSONResponse(
+        {"detail": detail},
+        status_code=status,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class AdmissionMiddleware:
+    """
+    Pure ASGI, like MetricsMiddleware; rejected requests never reach
+    the routers (or a worker thread).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        pool, prefix = match_pool(scope["path"]) if scope["type"] == "http" and ADMISSION_ENABLED else (None, None)
+        if pool is None:
+            await self.app(scope, receive, send)
+            return
+        # Rejections never reach the router, so MetricsMiddleware can't see
+        # a route; it labels them with this instead of "unmatched".
+        rejected_route = prefix + "/*"
+
+        if pool.buckets is not None and peer_address(scope) not in _LOOPBACK:
+            wait = pool.buckets.take(client_id(scope))
+            if wait:
+                ADMISSION_REJECTED.inc(pool.name, "rate_limited")
+                scope["admission_route"] = rejected_route
+                await _reject(429, wait, "Too many requests, slow down.")(scope, receive, send)
+                return
+
+        reason = await pool.acquire()
+        if reason is not None:
+            ADMISSION_REJECTED.inc(pool.name, reason)
+            scope["admission_route"] = rejected_route
+            await _reject(503, pool.retry_after(), "Server busy, please retry.")(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            pool.release(time.perf_counter() - start)
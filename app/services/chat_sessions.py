@@ -0,0 +1,162 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from .metrics import Gauge
+
+# Sessions idle for longer than this are dropped.
+CHAT_SESSION_TTL_SECONDS = float(os.getenv("CHAT_SESSION_TTL_SECONDS", str(60 * 60)))
+# Upper bound on live sessions; least recently used go first.
+CHAT_SESSION_MAX = int(os.getenv("CHAT_SESSION_MAX", "5000"))
+# Prompt budget for prior turns (recent turns + digest of older ones).
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "1200"))
+# Share of the history budget the digest of older turns may use.
+CHAT_DIGEST_TOKEN_BUDGET = int(os.getenv("CHAT_DIGEST_TOKEN_BUDGET", "250"))
+# A single stored turn is cut to this, so one long reply can't crowd out the rest.
+CHAT_TURN_TOKEN_LIMIT = int(os.getenv("CHAT_TURN_TOKEN_LIMIT", "300"))
+
+CHAT_SESSIONS = Gauge("chat_sessions", "Live server-side chat sessions.")
+
+# Parameters the intent extractor can return, per calculation intent.
+INTENT_PARAMS = {
+    "emi": ("income", "loan_amount", "interest_rate", "tenure_years"),
+    "sip": ("income", "monthly_amount", "years", "fund_name"),
+    "mutual_fund_info": ("fund_name",),
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    ~4 characters per token for English; close enough for budgeting
+    and avoids shipping a tokenizer.
+    """
+    return len(text) // 4 + 1
+
+
+def _clip(text: str, tokens: int) -> str:
+    limit = tokens * 4
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+# --------------------------------------------------
+# Session
+# --------------------------------------------------
+class ChatSession:
+    __slots__ = ("session_id", "turns", "digest", "last_intent", "params", "updated_at", "lock")
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.turns: List[dict] = []  # {"role", "content", "tokens"}, oldest first
+        self.digest: List[str] = []  # one line per user turn that aged out
+        self.last_intent: Optional[str] = None
+        self.params: Dict[str, dict] = {}  # intent -> last known parameters
+        self.updated_at = time.monotonic()
+        # one request at a time per session, so turns stay in order
+        self.lock = threading.Lock()
+
+    def add_turn(self, role: str, content: str):
+        content = _clip(content or "", CHAT_TURN_TOKEN_LIMIT)
+        self.turns.append({"role": role, "content": content, "tokens": estimate_tokens(content)})
+        self._trim()
+
+    def _trim(self):
+        """
+        Keeps the newest turns within the history budget. User messages
+        that drop out are kept as one-line digest entries (assistant
+        replies are dropped: the facts they relied on live in `params`).
+        """
+        budget = CHAT_HISTORY_TOKEN_BUDGET - self._digest_tokens()
+        total = sum(t["tokens"] for t in self.turns)
+        while self.turns and total > budget:
+            old = self.turns.pop(0)
+            total -= old["tokens"]
+            if old["role"] == "user":
+                self.digest.append(_clip(old["content"], 40))
+                while self.digest and self._digest_tokens() > CHAT_DIGEST_TOKEN_BUDGET:
+                    self.digest.pop(0)
+                budget = CHAT_HISTORY_TOKEN_BUDGET - self._digest_tokens()
+
+    def _digest_tokens(self) -> int:
+        return sum(estimate_tokens(line) for line in self.digest)
+
+    def remember(self, intent: str, parsed: dict) -> dict:
+        """
+        Merges this turn's extracted values into what we already know for
+        `intent`, so "what about 15 years instead?" keeps the amount from
+        the previous turn. Returns the merged parameters.
+        """
+        known = dict(self.params.get(intent, {}))
+        for key in INTENT_PARAMS.get(intent, ()):
+            if parsed.get(key) is not None:
+                known[key] = parsed[key]
+        self.params[intent] = known
+        self.last_intent = intent
+        return known
+
+    def context_note(self) -> str:
+        """
+        Compact system-prompt addendum: known parameters + digest.
+        """
+        lines = []
+        if self.last_intent and self.params.get(self.last_intent):
+            values = ", ".join(f"{k}={v}" for k, v in self.params[self.last_intent].items())
+            lines.append(f"Known details from this conversation ({self.last_intent}): {values}.")
+        if self.digest:
+            lines.append("Earlier the user asked: " + " | ".join(self.digest))
+        return "\n".join(lines)
+
+    def history(self) -> List[dict]:
+        return [{"role": t["role"], "content": t["content"]} for t in self.turns]
+
+
+# --------------------------------------------------
+# Store (in-process, LRU + TTL)
+# --------------------------------------------------
+class ChatSessionStore:
+    def __init__(self, max_sessions: int = CHAT_SESSION_MAX, ttl_seconds: float = CHAT_SESSION_TTL_SECONDS):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def get_or_create(self, session_id: Optional[str]) -> ChatSession:
+        """
+        Unknown or expired IDs start a fresh session under a new ID.
+        """
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(session_id) if session_id else None
+            if session is not None and now - session.updated_at > self.ttl_seconds:
+                del self._sessions[session_id]
+                session = None
+
+            if session is None:
+                session = ChatSession(uuid.uuid4().hex)
+                self._sessions[session.session_id] = session
+                # oldest-used first, so expired sessions sit at the front
+                while self._sessions:
+                    oldest = next(iter(self._sessions.values()))
+                    if len(self._sessions) <= self.max_sessions and now - oldest.updated_at <= self.ttl_seconds:
+                        break
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session_id)
+
+            session.updated_at = now
+            CHAT_SESSIONS.set(value=len(self._sessions))
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            found = self._sessions.pop(session_id, None) is not None
+            CHAT_SESSIONS.set(value=len(self._sessions))
+            return found
+
+
+CHAT_SESSION_STORE = ChatSessionStore()
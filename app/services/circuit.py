@@ -0,0 +1,106 @@
+import threading
+import time
+from typing import Dict, Optional
+
+from .metrics import Counter, Gauge
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+CIRCUIT_STATE = Gauge(
+    "upstream_circuit_state", "Circuit breaker state (0 closed, 1 half-open, 2 open).", ("dependency",)
+)
+CIRCUIT_REJECTED = Counter(
+    "upstream_circuit_rejected_total", "Calls failed fast because the circuit was open.", ("dependency",)
+)
+
+BREAKERS: Dict[str, "CircuitBreaker"] = {}
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} is unavailable (circuit open, retry in {retry_in:.0f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures; while open every
+    call fails fast. After `reset_seconds` one trial call is let through
+    (half-open): success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.last_error: Optional[str] = None
+        self.last_success_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+        BREAKERS[name] = self
+        CIRCUIT_STATE.set(name, value=0)
+
+    def before_call(self):
+        """
+        Raises CircuitOpenError when the call should not be attempted.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            retry_in = self.opened_at + self.reset_seconds - time.monotonic()
+            if self.state == OPEN and retry_in <= 0:
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+        CIRCUIT_REJECTED.inc(self.name)
+        raise CircuitOpenError(self.name, max(retry_in, 0.0))
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            self.last_success_at = time.time()
+            self._trial_in_flight = False
+            if self.state != CLOSED:
+                self._set_state(CLOSED)
+
+    def record_failure(self, error: BaseException):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_error = f"{type(error).__name__}: {error}"[:200]
+            self._trial_in_flight = False
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def release_trial(self):
+        """
+        For calls that ended without telling us anything about upstream
+        health (e.g. cancelled): let the next call be the trial.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def is_open(self) -> bool:
+        return self.state == OPEN and time.monotonic() - self.opened_at < self.reset_seconds
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+            "last_success_at": self.last_success_at,
+        }
+
+    def _set_state(self, state: str):
+        self.state = state
+        CIRCUIT_STATE.set(self.name, value=_STATE_VALUES[state])
@@ -0,0 +1,103 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterator, Optional
+
+from sqlalchemy import Table, func, select
+
+from ..db import engine
+
+EXPORT_CHUNK_SIZE = 1000
+
+
+# --------------------------------------------------
+# Cursor bound (snapshot the id range up front)
+# --------------------------------------------------
+def get_export_upper_bound(table: Table) -> int:
+    """
+    Highest id at the time the export starts.
+    Rows inserted while the export is streaming are left for the next run,
+    so this value doubles as the next `since` cursor.
+    """
+    with engine.connect() as conn:
+        return conn.execute(select(func.max(table.c.id))).scalar() or 0
+
+
+def _serialize(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+# --------------------------------------------------
+# Row streaming (keyset pages, no ORM objects)
+# --------------------------------------------------
+def iter_rows(
+    table: Table,
+    since: Optional[int],
+    until: int,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[list]:
+    """
+    Yields lists of plain row tuples, `chunk_size` at a time, for
+    since < id <= until, in id order.
+    Each chunk is its own short query (id > last seen), so memory stays
+    flat and no connection or read lock is held while the client is
+    still consuming the previous chunk; on SQLite that would block
+    every lead/appointment insert for the length of the download.
+    """
+    last = since if since is not None else -1
+    while last < until:
+        query = (
+            select(table)
+            .where(table.c.id > last, table.c.id <= until)
+            .order_by(table.c.id)
+            .limit(chunk_size)
+        )
+        with engine.connect() as conn:
+            chunk = conn.execute(query).all()
+        if not chunk:
+            return
+        yield chunk
+        last = chunk[-1].id
+
+
+def stream_csv(table: Table, since: Optional[int], until: int) -> Iterator[str]:
+    columns = [c.name for c in table.columns]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(columns)
+    yield buffer.getvalue()
+
+    for chunk in iter_rows(table, since, until):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([[_serialize(v) for v in row] for row in chunk])
+        yield buffer.getvalue()
+
+
+def stream_ndjson(table: Table, since: Optional[int], until: int) -> Iterator[str]:
+    columns = [c.name for c in table.columns]
+
+    for chunk in iter_rows(table, since, until):
+        yield "".join(
+            json.dumps(dict(zip(columns, (_serialize(v) for v in row)))) + "\n"
+            for row in chunk
+        )
+
+
+EXPORT_FORMATS = {
+    "csv": (stream_csv, "text/csv"),
+    "ndjson": (stream_ndjson, "application/x-ndjson"),
+}
+
+
+def export_table(table: Table, fmt: str, since: Optional[int]):
+    """
+    Returns (body iterator, media type, next `since` cursor).
+    """
+    streamer, media_type = EXPORT_FORMATS[fmt]
+    until = max(get_export_upper_bound(table), since or 0)
+    return streamer(table, since, until), media_type, until
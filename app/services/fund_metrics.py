@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import os
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+import httpx
+
+from .circuit import CircuitBreaker, CircuitOpenError
+from .mfapi import BASE_URL as MFAPI_BASE_URL, MFAPI_BREAKER, mfapi_get_json
+from .nav_cache import NavSeries, parse_mfapi_date
+
+logger = logging.getLogger(__name__)
+
+# Seconds between refresh runs; 0 disables the background job.
+FUND_METRICS_REFRESH_SECONDS = float(os.getenv("FUND_METRICS_REFRESH_SECONDS", str(6 * 3600)))
+FUND_METRICS_CONCURRENCY = int(os.getenv("FUND_METRICS_CONCURRENCY", "8"))
+# Only index Direct-Growth plans (what the bot recommends) unless disabled.
+FUND_METRICS_DIRECT_GROWTH_ONLY = os.getenv("FUND_METRICS_DIRECT_GROWTH_ONLY", "1") == "1"
+# Minimum wait after startup before the first run, so a restart/redeploy
+# doesn't add a full mfapi sweep to its cold start.
+FUND_METRICS_STARTUP_DELAY_SECONDS = float(os.getenv("FUND_METRICS_STARTUP_DELAY_SECONDS", "300"))
+# Cap on schemes per run (0 = no cap), mostly for local development.
+FUND_METRICS_MAX_SCHEMES = int(os.getenv("FUND_METRICS_MAX_SCHEMES", "0"))
+
+BATCH_SIZE = 50
+
+# The refresh makes thousands of calls; its failures (including 429s its
+# own burst draws) trip this breaker, never the one user requests go
+# through. A run stops as soon as either is open.
+FUND_METRICS_BREAKER = CircuitBreaker(
+    "mfapi_batch",
+    failure_threshold=int(os.getenv("FUND_METRICS_BREAKER_FAILURES", "10")),
+    reset_seconds=float(os.getenv("FUND_METRICS_BREAKER_RESET_SECONDS", "300")),
+)
+
+
+# --------------------------------------------------
+# Category normalisation
+# --------------------------------------------------
+def normalize_category(value: Optional[str]) -> str:
+    """
+    "Flexi Cap Fund" / "flexi cap" → "flexi cap"
+    """
+    value = (value or "").strip().lower()
+    if value.endswith(" fund"):
+        value = value[: -len(" fund")]
+    return value
+
+
+def split_scheme_category(scheme_category: Optional[str]):
+    """
+    "Equity Scheme - Flexi Cap Fund" → ("equity", "flexi cap").
+    Older mfapi categories without a " - " land in asset class "other".
+    """
+    if scheme_category and " - " in scheme_category:
+        asset, sub = scheme_category.split(" - ", 1)
+        return asset.lower().replace("scheme", "").strip(), normalize_category(sub)
+    return "other", normalize_category(scheme_category)
+
+
+def is_direct_growth(name: str) -> bool:
+    lowered = name.lower()
+    return "direct" in lowered and "growth" in lowered and "idcw" not in lowered and "dividend" not in lowered
+
+
+def build_row(series: NavSeries) -> Optional[dict]:
+    from .nav_stats import compute_metrics
+
+    metrics = compute_metrics(series)
+    if metrics is None:
+        return None
+
+    asset_class, category = split_scheme_category(series.meta.get("scheme_category"))
+    return {
+        "scheme_code": series.scheme_code,
+        "scheme_name": series.meta.get("scheme_name") or series.scheme_code,
+        "fund_house": series.meta.get("fund_house"),
+        "scheme_category": series.meta.get("scheme_category"),
+        "asset_class": asset_class,
+        "category": category,
+        **metrics,
+    }
+
+
+# --------------------------------------------------
+# DB access (sync, run in a worker thread)
+# --------------------------------------------------
+def _load_known_dates() -> Dict[str, date]:
+    from ..db import SessionLocal
+    from ..models import FundMetrics
+
+    db = SessionLocal()
+    try:
+        return dict(db.query(FundMetrics.scheme_code, FundMetrics.last_nav_date).all())
+    finally:
+        db.close()
+
+
+def _last_updated() -> Optional[datetime]:
+    from sqlalchemy import func
+
+    from ..db import SessionLocal
+    from ..models import FundMetrics
+
+    db = SessionLocal()
+    try:
+        return db.query(func.max(FundMetrics.updated_at)).scalar()
+    finally:
+        db.close()
+
+
+def _upsert(rows: List[dict]):
+    from ..db import SessionLocal
+    from ..models import FundMetrics
+
+    db = SessionLocal()
+    try:
+        for row in rows:
+            db.merge(FundMetrics(**row))
+        db.commit()
+    finally:
+        db.close()
+
+
+# --------------------------------------------------
+# Refresh job
+# --------------------------------------------------
+async def _latest_nav_date(client: httpx.AsyncClient, scheme_code: str) -> Optional[date]:
+    doc = await mfapi_get_json(f"/mf/{scheme_code}/latest", "scheme_latest", client, FUND_METRICS_BREAKER)
+    data = doc.get("data") or []
+    return date.fromordinal(parse_mfapi_date(data[0]["date"])) if data else None
+
+
+async def _refresh_one(client: httpx.AsyncClient, scheme_code: str, known: Dict[str, date]) -> Optional[dict]:
+    # Incremental: only refetch the full history when a new NAV has landed.
+    if scheme_code in known and known[scheme_code] is not None:
+        latest = await _latest_nav_date(client, scheme_code)
+        if latest is None or latest <= known[scheme_code]:
+            return None
+
+    doc = await mfapi_get_json(f"/mf/{scheme_code}", "scheme", client, FUND_METRICS_BREAKER)
+    series = NavSeries.from_mfapi(scheme_code, doc)
+    # numpy work is small per scheme; keep it off the loop anyway
+    return await asyncio.to_thread(build_row, series)
+
+
+def _circuit_open() -> bool:
+    return FUND_METRICS_BREAKER.is_open() or MFAPI_BREAKER.is_open()
+
+
+async def refresh_fund_metrics(scheme_codes: Optional[List[str]] = None) -> dict:
+    """
+    One pass over the scheme universe. Returns counts for logging.
+    """
+    if _circuit_open():
+        return {"skipped": "mfapi circuit open"}
+
+    if scheme_codes is None:
+        from .scheme_lookup import get_cached_schemes
+
+        schemes = await get_cached_schemes()
+        if FUND_METRICS_DIRECT_GROWTH_ONLY:
+            schemes = [s for s in schemes if is_direct_growth(s.get("schemeName", ""))]
+        scheme_codes = [str(s["schemeCode"]) for s in schemes]
+        if FUND_METRICS_MAX_SCHEMES:
+            scheme_codes = scheme_codes[:FUND_METRICS_MAX_SCHEMES]
+
+    known = await asyncio.to_thread(_load_known_dates)
+    semaphore = asyncio.Semaphore(FUND_METRICS_CONCURRENCY)
+    stats = {"schemes": len(scheme_codes), "updated": 0, "unchanged": 0, "failed": 0, "skipped": 0}
+    pending_rows: List[dict] = []
+
+    async def worker(client, code):
+        async with semaphore:
+            # back off for the rest of the run once mfapi looks unhealthy
+            if _circuit_open():
+                stats["skipped"] += 1
+                return
+            try:
+                row = await _refresh_one(client, code, known)
+            except CircuitOpenError:
+                stats["skipped"] += 1
+                return
+            except Exception as e:
+                logger.debug("fund metrics refresh failed for %s: %s", code, e)
+                stats["failed"] += 1
+                return
+        if row is None:
+            stats["unchanged"] += 1
+            return
+        pending_rows.append(row)
+        stats["updated"] += 1
+        if len(pending_rows) >= BATCH_SIZE:
+            batch = pending_rows[:]
+            pending_rows.clear()
+            await asyncio.to_thread(_upsert, batch)
+
+    async with httpx.AsyncClient(base_url=MFAPI_BASE_URL, timeout=20.0) as client:
+        await asyncio.gather(*(worker(client, code) for code in scheme_codes))
+
+    if pending_rows:
+        await asyncio.to_thread(_upsert, pending_rows)
+
+    return stats
+
+
+async def refresh_fund_metrics_periodically(wait_for: Optional[asyncio.Future] = None):
+    """
+    Background loop started from the app lifespan.
+    """
+    if FUND_METRICS_REFRESH_SECONDS <= 0:
+        return
+
+    if wait_for is not None:
+        await asyncio.shield(wait_for)  # tables must exist first
+
+    # The index survives restarts: pick up the schedule where the last
+    # process left it instead of sweeping mfapi on every start.
+    last_updated = await asyncio.to_thread(_last_updated)
+    due_in = 0.0
+    if last_updated is not None:
+        due_in = FUND_METRICS_REFRESH_SECONDS - (datetime.utcnow() - last_updated).total_seconds()
+    delay = max(FUND_METRICS_STARTUP_DELAY_SECONDS, due_in)
+    logger.info("fund metrics: first refresh in %.0fs (index last updated %s)", delay, last_updated)
+    await asyncio.sleep(delay)
+
+    while True:
+        try:
+            stats = await refresh_fund_metrics()
+            logger.info("fund metrics refresh: %s", stats)
+        except Exception as e:
+            logger.warning("fund metrics refresh failed: %s", e)
+        await asyncio.sleep(FUND_METRICS_REFRESH_SECONDS)
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import secrets
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+import httpx
+
+from ..schemas import GoalSimInput, GoalSimResult
+from .nav_cache import NAV_CACHE, get_nav_series
+
+logger = logging.getLogger(__name__)
+
+# Paths per chunk. Chunks are the unit of seeding, so results for a given
+# seed only depend on this, not on whether the pool was used.
+GOAL_SIM_CHUNK_PATHS = int(os.getenv("GOAL_SIM_CHUNK_PATHS", "10000"))
+# Runs above this many simulated path-months are spread over the pool.
+GOAL_SIM_POOL_THRESHOLD = int(os.getenv("GOAL_SIM_POOL_THRESHOLD", str(5_000_000)))
+# 0 or 1 disables the pool (everything runs in a worker thread).
+GOAL_SIM_WORKERS = int(os.getenv("GOAL_SIM_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+MIN_HISTORY_MONTHS = 24
+
+
+# --------------------------------------------------
+# Process pool (created on first large run)
+# --------------------------------------------------
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the server process has live threads
+            _pool = ProcessPoolExecutor(
+                max_workers=GOAL_SIM_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _run_inline(chunks, returns, payload: GoalSimInput, months: int):
+    import numpy as np
+    from .monte_carlo import simulate_chunk
+
+    return np.concatenate([
+        simulate_chunk(returns, payload.monthly_amount, payload.lumpsum_amount, months, paths, seed)
+        for paths, seed in chunks
+    ], axis=1)
+
+
+async def _run_pool(chunks, returns, payload: GoalSimInput, months: int):
+    import numpy as np
+    from .monte_carlo import simulate_chunk
+
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    parts = await asyncio.gather(*(
+        loop.run_in_executor(
+            pool, simulate_chunk, returns, payload.monthly_amount, payload.lumpsum_amount, months, paths, seed
+        )
+        for paths, seed in chunks
+    ))
+    return await asyncio.to_thread(np.concatenate, parts, axis=1)
+
+
+# --------------------------------------------------
+# Goal simulation
+# --------------------------------------------------
+async def _scheme_series(scheme_code: str):
+    """
+    get_nav_series, with an unknown scheme code reported as bad input.
+    """
+    try:
+        return await get_nav_series(scheme_code)
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            raise ValueError(f"Unknown scheme code: {scheme_code}") from e
+        raise
+
+
+async def simulate_goal(payload: GoalSimInput) -> GoalSimResult:
+    """
+    Bootstraps `paths` SIP outcomes from the schemes' historical monthly
+    returns and reports percentile bands plus P(corpus >= goal).
+    """
+    import numpy as np
+    from .monte_carlo import monthly_returns, summarize_paths
+
+    weights = payload.weights or [1.0] * len(payload.scheme_codes)
+    if len(weights) != len(payload.scheme_codes):
+        raise ValueError("weights must have one entry per scheme code.")
+    if sum(weights) <= 0 or min(weights) < 0:
+        raise ValueError("weights must be non-negative and not all zero.")
+    weights = [w / sum(weights) for w in weights]
+
+    months = int(round(payload.years * 12))
+    if months < 1:
+        raise ValueError("years must cover at least one month.")
+
+    series_list = await asyncio.gather(*(_scheme_series(code) for code in payload.scheme_codes))
+    returns = await asyncio.to_thread(monthly_returns, series_list, weights, payload.lookback_years)
+    if len(returns) < MIN_HISTORY_MONTHS:
+        raise ValueError(
+            f"Need at least {MIN_HISTORY_MONTHS} months of common NAV history, found {len(returns)}."
+        )
+
+    seed = payload.seed if payload.seed is not None else secrets.randbelow(2**31)
+    sizes = [GOAL_SIM_CHUNK_PATHS] * (payload.paths // GOAL_SIM_CHUNK_PATHS)
+    if payload.paths % GOAL_SIM_CHUNK_PATHS:
+        sizes.append(payload.paths % GOAL_SIM_CHUNK_PATHS)
+    chunks = list(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+
+    values = None
+    if GOAL_SIM_WORKERS > 1 and len(chunks) > 1 and payload.paths * months > GOAL_SIM_POOL_THRESHOLD:
+        try:
+            values = await _run_pool(chunks, returns, payload, months)
+        except BrokenProcessPool as e:
+            logger.warning("goal simulation pool broke, running inline: %s", e)
+            shutdown_pool()
+    if values is None:
+        values = await asyncio.to_thread(_run_inline, chunks, returns, payload, months)
+
+    summary = await asyncio.to_thread(summarize_paths, values, months, payload.goal_amount)
+    return GoalSimResult(
+        goal_amount=payload.goal_amount,
+        total_invested=round(payload.lumpsum_amount + payload.monthly_amount * months, 2),
+        paths=payload.paths,
+        seed=seed,
+        history_months=len(returns),
+        stale=any(NAV_CACHE.is_stale(series) for series in series_list),
+        **summary,
+    )
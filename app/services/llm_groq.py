@@ -1,5 +1,38 @@
 import os
-from groq import Groq
+import threading
+
+GROQ_MODEL = "llama-3.1-8b-instant"
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_groq_client():
+    """
+    Builds the Groq client once per process.
+    `groq` is imported here rather than at module level so app startup
+    doesn't pay for it.
+    """
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from groq import Groq
+                _client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+    return _client
+
+
+def warm_groq():
+    """
+    Creates the client and opens a connection to the API so the first
+    chat request doesn't pay for the import + TLS handshake.
+    """
+    if not os.getenv("GROQ_API_KEY"):
+        raise RuntimeError("Missing GROQ_API_KEY")
+
+    get_groq_client().models.list()
+
 
 def call_llm_groq(messages):
     api_key = os.getenv("GROQ_API_KEY")
@@ -8,10 +41,10 @@ def call_llm_groq(messages):
         return "Backend error: Missing GROQ_API_KEY"
 
     try:
-        client = Groq(api_key=api_key)
+        client = get_groq_client()
 
         response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
+            model=GROQ_MODEL,
             messages=messages,
             temperature=0.3,
         )
@@ -1,11 +1,12 @@
-import requests
-
 OLLAMA_URL = "http://localhost:11434/api/chat"
 
+
 def call_llm_ollama(messages, model: str = "llama3"):
     """
     Call LLaMA 3 model using local Ollama.
     """
+    import requests
+
     payload = {
         "model": model,
         "messages": messages,
@@ -23,3 +24,20 @@ def call_llm_ollama(messages, model: str = "llama3"):
         return data[-1]["message"]["content"]
 
     return str(data)
+
+
+def warm_ollama(model: str = "llama3"):
+    """
+    Loads the model into Ollama's memory with a tiny prompt.
+    """
+    import requests
+
+    requests.post(
+        OLLAMA_URL,
+        json={
+            "model": model,
+            "messages": [{"role": "user", "content": "warmup"}],
+            "stream": False
+        },
+        timeout=5
+    ).raise_for_status()
@@ -0,0 +1,34 @@
+import os
+
+from .metrics import track_upstream
+
+# "groq" in the cloud, "ollama" for local development
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "groq").lower()
+
+
+def call_llm(messages) -> str:
+    """
+    Dispatches to the configured provider.
+    Provider modules are imported on first use only.
+    """
+    if LLM_PROVIDER == "ollama":
+        from .llm_ollama import call_llm_ollama
+        with track_upstream("llm_ollama"):
+            return call_llm_ollama(messages)
+
+    from .llm_groq import call_llm_groq
+    with track_upstream("llm_groq"):
+        return call_llm_groq(messages)
+
+
+def warm_llm():
+    """
+    Warms only the provider that is actually configured.
+    """
+    if LLM_PROVIDER == "ollama":
+        from .llm_ollama import warm_ollama
+        warm_ollama()
+        return
+
+    from .llm_groq import warm_groq
+    warm_groq()
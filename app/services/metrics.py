@@ -0,0 +1,316 @@
+"""
+Tiny in-process metrics registry with Prometheus text exposition.
+
+Hot-path cost is a dict lookup, a bisect and a couple of additions under
+a per-metric lock; everything else (cumulative buckets, ratios, text
+formatting) happens at scrape time.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from starlette.requests import Request
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0,
+)
+DB_QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+_REGISTRY: List["_Metric"] = []
+
+
+# --------------------------------------------------
+# Metric types
+# --------------------------------------------------
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, *labelvalues, amount: float = 1.0):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def value(self, *labelvalues) -> float:
+        return self._values.get(labelvalues, 0.0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labelvalues, amount: float = 1.0):
+        self.inc(*labelvalues, amount=-amount)
+
+    def set(self, *labelvalues, value: float):
+        with self._lock:
+            self._values[labelvalues] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[tuple, list] = {}
+
+    def observe(self, value: float, *labelvalues):
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labelvalues)
+            if state is None:
+                state = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][idx] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = [(k, (list(v[0]), v[1], v[2])) for k, v in self._values.items()]
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                bucket_labels = _format_labels(self.labelnames, labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+# --------------------------------------------------
+# Metrics exported by the app
+# --------------------------------------------------
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route and status.", ("method", "route", "status")
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("method", "route")
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Requests currently being handled.", ("method", "route")
+)
+
+UPSTREAM_LATENCY = Histogram(
+    "upstream_request_duration_seconds", "Latency of calls to upstream dependencies.", ("dependency",)
+)
+UPSTREAM_ERRORS = Counter(
+    "upstream_errors_total", "Failed calls to upstream dependencies.", ("dependency",)
+)
+
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds", "Latency of individual DB statements.", buckets=DB_QUERY_BUCKETS
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "DB statements issued per HTTP request.", ("route",), buckets=COUNT_BUCKETS
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds", "Total DB time per HTTP request.", ("route",), buckets=DB_QUERY_BUCKETS
+)
+
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total", "Cache lookups by outcome.", ("cache", "result")
+)
+
+
+# --------------------------------------------------
+# Per-request stats (propagated into threadpool via contextvars)
+# --------------------------------------------------
+class RequestStats:
+    __slots__ = ("method", "route", "db_queries", "db_time")
+
+    def __init__(self, method: str):
+        self.method = method
+        self.route: Optional[str] = None
+        self.db_queries = 0
+        self.db_time = 0.0
+
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _current_request.get()
+
+
+async def track_route(request: Request):
+    """
+    App-level dependency: by the time it runs the route template is known,
+    so this is where the request becomes visible in the in-flight gauge.
+    """
+    stats = _current_request.get()
+    route = request.scope.get("route")
+    if stats is not None and route is not None:
+        stats.route = route.path
+        HTTP_IN_FLIGHT.inc(stats.method, stats.route)
+
+
+# --------------------------------------------------
+# Instrumentation API
+# --------------------------------------------------
+class track_upstream:
+    """
+    Times a call to an upstream dependency; works in sync and async code:
+
+        with track_upstream("mfapi_scheme"):
+            resp = await client.get(...)
+    """
+    __slots__ = ("dependency", "_start")
+
+    def __init__(self, dependency: str):
+        self.dependency = dependency
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        UPSTREAM_LATENCY.observe(time.perf_counter() - self._start, self.dependency)
+        if exc_type is not None:
+            UPSTREAM_ERRORS.inc(self.dependency)
+        return False
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    CACHE_LOOKUPS.inc(cache, "hit" if hit else "miss")
+
+
+def instrument_engine(engine):
+    """
+    Hooks SQLAlchemy cursor events to time every statement and attribute
+    it to the current request.
+    """
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        DB_QUERY_LATENCY.observe(elapsed)
+        stats = _current_request.get()
+        if stats is not None:
+            stats.db_queries += 1
+            stats.db_time += elapsed
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+
+    # Hit ratio is derivable from the counter, but handy to have precomputed.
+    lines.append("# HELP cache_hit_ratio Cache hits / lookups since process start.")
+    lines.append("# TYPE cache_hit_ratio gauge")
+    caches = {labels[0] for labels in list(CACHE_LOOKUPS._values)}
+    for cache in sorted(caches):
+        hits = CACHE_LOOKUPS.value(cache, "hit")
+        total = hits + CACHE_LOOKUPS.value(cache, "miss")
+        ratio = hits / total if total else 0.0
+        lines.append(f'cache_hit_ratio{{cache="{_escape(cache)}"}} {_format_value(ratio)}')
+
+    return "\n".join(lines) + "\n"
+
+
+# --------------------------------------------------
+# ASGI middleware
+# --------------------------------------------------
+class MetricsMiddleware:
+    """
+    Records per-route latency, status and DB usage for every HTTP request.
+    Pure ASGI (no BaseHTTPMiddleware) to keep per-request overhead low.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope["method"])
+        token = _current_request.set(stats)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current_request.reset(token)
+
+            route = stats.route
+            if route is None:
+                resolved = scope.get("route")
+                if resolved is not None:
+                    route = resolved.path
+                else:
+                    # set by AdmissionMiddleware for requests it turned away
+                    route = scope.get("admission_route", "unmatched")
+            else:
+                HTTP_IN_FLIGHT.dec(stats.method, route)
+
+            HTTP_REQUESTS.inc(stats.method, route, str(status))
+            HTTP_LATENCY.observe(elapsed, stats.method, route)
+            DB_QUERIES_PER_REQUEST.observe(stats.db_queries, route)
+            if stats.db_queries:
+                DB_TIME_PER_REQUEST.observe(stats.db_time, route)
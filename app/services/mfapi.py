@@ -1,11 +1,110 @@
+import asyncio
+import os
+from typing import Optional
+
 import httpx
 
+from .circuit import CircuitBreaker, CircuitOpenError
+from .metrics import track_upstream
+
+
+BASE_URL = os.getenv("MFAPI_BASE_URL", "https://api.mfapi.in")
+
+# Total budget per call (connect + response + body), by endpoint. Past it
+# the call counts as a failure; callers with cached data serve that instead.
+MFAPI_DEADLINES = {
+    "scheme": float(os.getenv("MFAPI_DEADLINE_SCHEME_SECONDS", "8")),
+    "scheme_list": float(os.getenv("MFAPI_DEADLINE_LIST_SECONDS", "10")),
+    "scheme_latest": float(os.getenv("MFAPI_DEADLINE_LATEST_SECONDS", "4")),
+}
+
+MFAPI_BREAKER = CircuitBreaker(
+    "mfapi",
+    failure_threshold=int(os.getenv("MFAPI_BREAKER_FAILURES", "5")),
+    reset_seconds=float(os.getenv("MFAPI_BREAKER_RESET_SECONDS", "30")),
+)
+
+
+def _is_upstream_failure(error: Exception) -> bool:
+    """
+    Timeouts, connection errors, 5xx/429 and garbage bodies say mfapi is
+    unhealthy; a 404 for an unknown scheme code does not.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500 or error.response.status_code == 429
+    return isinstance(error, (httpx.TransportError, TimeoutError, ValueError))
 
-BASE_URL = "https://api.mfapi.in"
+
+def is_unavailable(error: Exception) -> bool:
+    """
+    True when serving last-good data is the right response to `error`.
+    """
+    return isinstance(error, CircuitOpenError) or _is_upstream_failure(error)
+
+
+async def mfapi_get_json(
+    path: str,
+    endpoint: str,
+    client: Optional[httpx.AsyncClient] = None,
+    breaker: CircuitBreaker = MFAPI_BREAKER,
+):
+    """
+    GET {BASE_URL}{path} through `breaker` (the interactive mfapi breaker
+    unless a batch job passes its own), within the endpoint's deadline.
+    Raises CircuitOpenError without calling out while the circuit is open.
+    """
+    deadline = MFAPI_DEADLINES[endpoint]
+
+    async def fetch() -> httpx.Response:
+        if client is None:
+            async with httpx.AsyncClient(base_url=BASE_URL, timeout=deadline) as own_client:
+                return await own_client.get(path)
+        return await client.get(path)
+
+    breaker.before_call()
+    try:
+        with track_upstream(f"mfapi_{endpoint}"):
+            # wait_for rather than asyncio.timeout: the latter is 3.11+
+            resp = await asyncio.wait_for(fetch(), deadline)
+            resp.raise_for_status()
+            data = resp.json()
+    except asyncio.CancelledError:
+        breaker.release_trial()
+        raise
+    except asyncio.TimeoutError as e:
+        error = TimeoutError(f"mfapi {endpoint} call exceeded its {deadline:g}s deadline")
+        breaker.record_failure(error)
+        raise error from e
+    except httpx.HTTPStatusError as e:
+        # mfapi answered; only 5xx/429 say it is unhealthy (404 = unknown code)
+        if _is_upstream_failure(e):
+            breaker.record_failure(e)
+        else:
+            breaker.record_success()
+        raise
+    except Exception as e:
+        # No verdict from a response: transport errors and garbage bodies
+        # are failures, anything else (a bug on our side, say) says
+        # nothing about mfapi and must not close a half-open circuit.
+        if _is_upstream_failure(e):
+            breaker.record_failure(e)
+        else:
+            breaker.release_trial()
+        raise
+
+    breaker.record_success()
+    return data
 
 
 async def get_scheme_data(scheme_code: str):
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        resp = await client.get(f"{BASE_URL}/mf/{scheme_code}")
-        resp.raise_for_status()
-        return resp.json()
+    """
+    mfapi scheme document plus a "stale" flag, served from the NAV cache
+    (fresh copies skip mfapi entirely; expired ones follow the cache's
+    stale-while-revalidate and last-good rules).
+    """
+    from .nav_cache import NAV_CACHE, get_nav_series
+
+    series = await get_nav_series(str(scheme_code))
+    # rebuilding the document is O(history); keep it off the loop
+    doc = await asyncio.to_thread(series.to_mfapi)
+    return {**doc, "stale": NAV_CACHE.is_stale(series)}
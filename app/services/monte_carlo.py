@@ -0,0 +1,118 @@
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .nav_cache import NavSeries
+from .nav_stats import _EPOCH_ORDINAL, month_starts
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def monthly_returns(
+    series_list: Sequence[NavSeries],
+    weights: Sequence[float],
+    lookback_years: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Month-on-month returns of a fixed-weight blend, sampled on the first
+    NAV of each calendar month. Only months every scheme has a return for
+    are kept, so one bootstrap draw is one real month for the whole blend
+    (cross-scheme correlation survives resampling).
+    """
+    keyed = []
+    for series in series_list:
+        ordinals, navs = series.as_arrays()
+        dates, monthly = month_starts(ordinals, navs)
+        months = (dates - _EPOCH_ORDINAL).astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        keyed.append((months[1:], monthly[1:] / monthly[:-1] - 1))
+
+    common = keyed[0][0]
+    for months, _ in keyed[1:]:
+        common = np.intersect1d(common, months)
+    if lookback_years and len(common):
+        common = common[common > common[-1] - lookback_years * 12]
+
+    blended = np.zeros(len(common))
+    for (months, returns), weight in zip(keyed, weights):
+        blended += weight * returns[np.searchsorted(months, common)]
+    return blended
+
+
+def snapshot_months(months: int) -> List[int]:
+    """
+    Month indices reported in the bands: every year end, plus the horizon.
+    """
+    points = list(range(12, months + 1, 12))
+    if not points or points[-1] != months:
+        points.append(months)
+    return points
+
+
+def simulate_chunk(
+    returns: np.ndarray,
+    monthly_amount: float,
+    lumpsum: float,
+    months: int,
+    paths: int,
+    seed: np.random.SeedSequence,
+) -> np.ndarray:
+    """
+    Corpus value at each snapshot month for `paths` bootstrapped paths,
+    shape (len(snapshot_months(months)), paths). float32 throughout: the
+    error over a 40-year path is ~1e-5 relative, well inside the spread
+    being estimated, and it halves memory traffic.
+
+    Instalments go in at the start of each month. With W_t the growth of
+    one rupee invested at month 0, the corpus after month t is
+    W_t * (lumpsum + amount * sum_{k<=t} 1 / W_{k-1}); so a whole chunk
+    is a cumprod and a cumsum over a (paths, months) matrix.
+    """
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, len(returns), size=(paths, months), dtype=np.int32)
+
+    wealth = returns.astype(np.float32)[idx]
+    del idx
+    wealth += 1.0
+    np.cumprod(wealth, axis=1, out=wealth)
+
+    units = np.empty_like(wealth)
+    units[:, 0] = 1.0
+    np.divide(1.0, wealth[:, :-1], out=units[:, 1:])
+    np.cumsum(units, axis=1, out=units)
+    units *= monthly_amount
+    units += lumpsum
+    units *= wealth
+
+    cols = [m - 1 for m in snapshot_months(months)]
+    return np.ascontiguousarray(units[:, cols].T)
+
+
+def _sorted_percentiles(values: np.ndarray, qs) -> np.ndarray:
+    # same as np.percentile's default (linear) method, on presorted data
+    pos = np.asarray(qs, dtype=np.float64) / 100 * (len(values) - 1)
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.minimum(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (pos - lo)
+
+
+def summarize_paths(values: np.ndarray, months: int, goal_amount: float) -> dict:
+    """
+    Percentile bands per snapshot and P(final corpus >= goal), in percent.
+    values: (snapshots, paths), as from simulate_chunk.
+
+    A full sort per snapshot is cheaper than np.percentile here: numpy's
+    vectorised float32 sort beats its multi-kth partition several times
+    over at 10^5-10^6 paths.
+    """
+    bands = []
+    final = None
+    for row, month in zip(values, snapshot_months(months)):
+        final = np.sort(row)
+        p = _sorted_percentiles(final.astype(np.float64), PERCENTILES)
+        bands.append({"year": round(month / 12, 2), **{f"p{q}": round(float(v), 2) for q, v in zip(PERCENTILES, p)}})
+
+    reached = len(final) - np.searchsorted(final, goal_amount, side="left")
+    return {
+        "probability_of_success": round(float(reached / len(final) * 100), 2),
+        "bands": bands,
+    }
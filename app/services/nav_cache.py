@@ -0,0 +1,267 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, Optional, Set
+
+from .metrics import Gauge, record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+# Memory budget for all cached series together (default 64 MiB).
+NAV_CACHE_MAX_BYTES = int(os.getenv("NAV_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# mfapi publishes one NAV per business day; refetch after this long.
+NAV_CACHE_TTL_SECONDS = float(os.getenv("NAV_CACHE_TTL_SECONDS", str(6 * 3600)))
+# For this long past the TTL, an expired series is served at once (flagged
+# stale) while one background task refetches it. Older copies are only
+# served when mfapi is down.
+NAV_CACHE_SWR_SECONDS = float(os.getenv("NAV_CACHE_SWR_SECONDS", str(24 * 3600)))
+
+NAV_CACHE_BYTES = Gauge("nav_cache_bytes", "Estimated bytes held by the NAV series cache.")
+NAV_CACHE_ENTRIES = Gauge("nav_cache_entries", "Schemes held by the NAV series cache.")
+
+# Per-entry bookkeeping (OrderedDict node, NavSeries object, array headers).
+_ENTRY_OVERHEAD = 512
+
+
+def parse_mfapi_date(value: str) -> int:
+    """
+    "dd-mm-YYYY" → proleptic ordinal. ~10x faster than strptime.
+    """
+    return date(int(value[6:10]), int(value[3:5]), int(value[0:2])).toordinal()
+
+
+# --------------------------------------------------
+# Compact series
+# --------------------------------------------------
+class NavSeries:
+    """
+    One scheme's NAV history, oldest → newest.
+    12 bytes per data point: int32 date ordinal + float64 NAV.
+    """
+    __slots__ = ("scheme_code", "meta", "ordinals", "navs", "fetched_at", "nbytes")
+
+    def __init__(self, scheme_code: str, meta: dict, ordinals: array, navs: array):
+        self.scheme_code = scheme_code
+        self.meta = meta
+        self.ordinals = ordinals
+        self.navs = navs
+        self.fetched_at = time.monotonic()
+        self.nbytes = (
+            ordinals.itemsize * len(ordinals)
+            + navs.itemsize * len(navs)
+            + _meta_size(meta)
+            + _ENTRY_OVERHEAD
+        )
+
+    def __len__(self):
+        return len(self.navs)
+
+    @property
+    def latest_nav(self) -> float:
+        return self.navs[-1]
+
+    @property
+    def age_seconds(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+    def as_arrays(self):
+        """
+        (ordinals as int64, navs as float64) numpy arrays; the NAVs are a
+        zero-copy view of the cached buffer, so don't write to them.
+        """
+        import numpy as np
+
+        ordinals = np.frombuffer(self.ordinals, dtype=np.int32).astype(np.int64)
+        return ordinals, np.frombuffer(self.navs, dtype=np.float64)
+
+    def to_mfapi(self) -> dict:
+        """
+        Back to mfapi's document shape (newest first).
+        """
+        data = []
+        for o, n in zip(reversed(self.ordinals), reversed(self.navs)):
+            d = date.fromordinal(o)  # f-string is ~2x faster than strftime here
+            data.append({"date": f"{d.day:02d}-{d.month:02d}-{d.year:04d}", "nav": f"{n:.5f}"})
+        return {"meta": self.meta, "data": data, "status": "SUCCESS"}
+
+    @classmethod
+    def from_mfapi(cls, scheme_code: str, scheme_data: dict) -> "NavSeries":
+        ordinals = array("i")
+        navs = array("d")
+
+        # mfapi lists newest first
+        for entry in reversed(scheme_data.get("data") or []):
+            try:
+                nav = float(entry["nav"])
+                ordinal = parse_mfapi_date(entry["date"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            ordinals.append(ordinal)
+            navs.append(nav)
+
+        return cls(scheme_code, scheme_data.get("meta") or {}, ordinals, navs)
+
+
+def _meta_size(meta: dict) -> int:
+    return sys.getsizeof(meta) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in meta.items())
+
+
+# --------------------------------------------------
+# Byte-budgeted LRU
+# --------------------------------------------------
+class NavCache:
+    def __init__(self, max_bytes: int = NAV_CACHE_MAX_BYTES, ttl_seconds: float = NAV_CACHE_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.current_bytes = 0
+        self._entries: "OrderedDict[str, NavSeries]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, scheme_code: str) -> Optional[NavSeries]:
+        """
+        Fresh (within TTL) series only. Expired entries stay in the cache
+        as last-good copies until the byte budget pushes them out.
+        """
+        with self._lock:
+            series = self._entries.get(scheme_code)
+            if series is not None and series.age_seconds > self.ttl_seconds:
+                series = None
+            if series is not None:
+                self._entries.move_to_end(scheme_code)
+
+        record_cache_lookup("nav_series", series is not None)
+        return series
+
+    def get_stale(self, scheme_code: str) -> Optional[NavSeries]:
+        """
+        Whatever copy we hold, however old.
+        """
+        with self._lock:
+            series = self._entries.get(scheme_code)
+            if series is not None:
+                self._entries.move_to_end(scheme_code)
+            return series
+
+    def is_stale(self, series: NavSeries) -> bool:
+        return series.age_seconds > self.ttl_seconds
+
+    def put(self, series: NavSeries):
+        if series.nbytes > self.max_bytes:
+            return  # would evict everything else and still not fit
+
+        with self._lock:
+            if series.scheme_code in self._entries:
+                self._remove(series.scheme_code)
+            self._entries[series.scheme_code] = series
+            self.current_bytes += series.nbytes
+
+            while self.current_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+            self._publish()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self._publish()
+
+    def _remove(self, scheme_code: str):
+        series = self._entries.pop(scheme_code)
+        self.current_bytes -= series.nbytes
+
+    def _publish(self):
+        NAV_CACHE_BYTES.set(value=self.current_bytes)
+        NAV_CACHE_ENTRIES.set(value=len(self._entries))
+
+
+NAV_CACHE = NavCache()
+
+# scheme_code -> in-flight fetch, so concurrent misses share one upstream call
+_pending: Dict[str, asyncio.Future] = {}
+# background revalidations (strong refs so they aren't garbage collected)
+_revalidating: Set[asyncio.Task] = set()
+
+
+async def _fetch(scheme_code: str) -> NavSeries:
+    """
+    Single-flight fetch + cache fill.
+    """
+    pending = _pending.get(scheme_code)
+    if pending is not None:
+        return await asyncio.shield(pending)
+
+    from .sip import fetch_scheme_full
+
+    future = asyncio.get_running_loop().create_future()
+    _pending[scheme_code] = future
+    try:
+        scheme_data = await fetch_scheme_full(scheme_code)
+        # parsing a 20-year history takes milliseconds; not on the loop
+        series = await asyncio.to_thread(NavSeries.from_mfapi, scheme_code, scheme_data)
+        NAV_CACHE.put(series)
+        future.set_result(series)
+        return series
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # mark retrieved when nobody else was waiting
+        raise
+    finally:
+        _pending.pop(scheme_code, None)
+
+
+def _revalidate(scheme_code: str):
+    from .mfapi import MFAPI_BREAKER
+
+    if scheme_code in _pending or MFAPI_BREAKER.is_open():
+        return
+
+    async def run():
+        try:
+            await _fetch(scheme_code)
+        except Exception as e:
+            logger.debug("NAV revalidation failed for %s: %s", scheme_code, e)
+
+    task = asyncio.create_task(run())
+    _revalidating.add(task)
+    task.add_done_callback(_revalidating.discard)
+
+
+async def get_nav_series(scheme_code: str) -> NavSeries:
+    """
+    Parsed NAV history for a scheme, served from the process cache
+    when possible. NAV_CACHE.is_stale(series) tells callers whether they
+    got a stale copy.
+    """
+    from .mfapi import is_unavailable
+
+    scheme_code = str(scheme_code)
+
+    series = NAV_CACHE.get(scheme_code)
+    if series is not None:
+        return series
+
+    last_good = NAV_CACHE.get_stale(scheme_code)
+    if last_good is not None and last_good.age_seconds <= NAV_CACHE.ttl_seconds + NAV_CACHE_SWR_SECONDS:
+        _revalidate(scheme_code)
+        return last_good
+
+    try:
+        return await _fetch(scheme_code)
+    except Exception as e:
+        if last_good is not None and is_unavailable(e):
+            return last_good
+        raise
@@ -0,0 +1,101 @@
+from datetime import date
+from typing import Optional
+
+import numpy as np
+
+from .nav_cache import NavSeries
+from .xirr import xirr_batch
+
+TRADING_DAYS = 252
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _cagr(ordinals: np.ndarray, navs: np.ndarray, years: int) -> Optional[float]:
+    target = ordinals[-1] - int(round(years * 365.25))
+    if ordinals[0] > target:
+        return None
+    idx = np.searchsorted(ordinals, target, side="right") - 1
+    days = ordinals[-1] - ordinals[idx]
+    if days <= 0 or navs[idx] <= 0:
+        return None
+    return ((navs[-1] / navs[idx]) ** (365.25 / days) - 1) * 100
+
+
+def _window(ordinals: np.ndarray, years: int) -> int:
+    """
+    Index of the first point within the trailing `years`.
+    """
+    return int(np.searchsorted(ordinals, ordinals[-1] - int(round(years * 365.25))))
+
+
+def month_starts(ordinals: np.ndarray, navs: np.ndarray):
+    """
+    (ordinals, navs) of the first NAV in each calendar month.
+    """
+    days = (ordinals - _EPOCH_ORDINAL).astype("datetime64[D]")
+    _, first_idx = np.unique(days.astype("datetime64[M]"), return_index=True)
+    return ordinals[first_idx], navs[first_idx]
+
+
+def rolling_sip_xirr(ordinals: np.ndarray, navs: np.ndarray, months: int = 36, lookback_years: int = 5) -> np.ndarray:
+    """
+    Annual XIRR (percent) of a `months`-long SIP started in each month of
+    the lookback, buying on the first NAV date of every calendar month and
+    valued at the first NAV date after the last instalment. All windows
+    are solved in one xirr_batch call.
+    """
+    start = _window(ordinals, lookback_years + months // 12)
+    monthly_dates, monthly = month_starts(ordinals[start:], navs[start:])
+
+    if len(monthly) <= months:
+        return np.empty(0)
+
+    # window w buys at monthly[w : w+months], valued at monthly[w+months]
+    windows = np.lib.stride_tricks.sliding_window_view(monthly[:-1], months)
+    end_navs = monthly[months:]
+
+    dates = np.lib.stride_tricks.sliding_window_view(monthly_dates, months + 1)
+    times = (dates - dates[:, :1]) / 365.0
+    amounts = np.full(dates.shape, -1.0)
+    amounts[:, -1] = (end_navs[:, None] / windows).sum(axis=1)
+
+    return xirr_batch(times, amounts) * 100
+
+
+def _rolling_sip_return(ordinals: np.ndarray, navs: np.ndarray, months: int = 36, lookback_years: int = 5):
+    returns = rolling_sip_xirr(ordinals, navs, months, lookback_years)
+    returns = returns[np.isfinite(returns)]
+    return float(np.median(returns)) if len(returns) else None
+
+
+def compute_metrics(series: NavSeries) -> Optional[dict]:
+    """
+    Trailing CAGR, volatility, drawdown and rolling SIP return for one
+    scheme, all in percent. None when there is too little history.
+    """
+    if len(series) < 2:
+        return None
+
+    ordinals, navs = series.as_arrays()
+
+    vol_start = _window(ordinals, 3)
+    log_returns = np.diff(np.log(navs[vol_start:]))
+    volatility = float(log_returns.std(ddof=1) * np.sqrt(TRADING_DAYS) * 100) if len(log_returns) > 20 else None
+
+    dd_navs = navs[_window(ordinals, 5):]
+    max_drawdown = float((dd_navs / np.maximum.accumulate(dd_navs) - 1).min() * 100)
+
+    def rounded(value):
+        return None if value is None or not np.isfinite(value) else round(float(value), 4)
+
+    return {
+        "last_nav_date": date.fromordinal(int(ordinals[-1])),
+        "latest_nav": float(navs[-1]),
+        "history_years": round((ordinals[-1] - ordinals[0]) / 365.25, 2),
+        "cagr_1y": rounded(_cagr(ordinals, navs, 1)),
+        "cagr_3y": rounded(_cagr(ordinals, navs, 3)),
+        "cagr_5y": rounded(_cagr(ordinals, navs, 5)),
+        "volatility": rounded(volatility),
+        "max_drawdown": rounded(max_drawdown),
+        "sip_return_3y": rounded(_rolling_sip_return(ordinals, navs)),
+    }
@@ -0,0 +1,237 @@
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Dict, Optional
+
+# Send "X-Profile-Token: <PROFILE_ADMIN_TOKEN>" to profile one request.
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN", "")
+PROFILE_HEADER = b"x-profile-token"
+# Fraction of all requests profiled without the header (0 = off).
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_MAX_STORED = int(os.getenv("PROFILE_MAX_STORED", "20"))
+# Optional: also write each profile to <PROFILE_DIR>/<id>.collapsed
+PROFILE_DIR = os.getenv("PROFILE_DIR", "")
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_ROOT = os.path.dirname(APP_ROOT)
+
+# A thread whose innermost Python frame lives in one of these modules is
+# blocked on a socket / selector / lock rather than burning CPU.
+_WAIT_MODULES = {"socket.py", "ssl.py", "selectors.py", "threading.py", "queue.py"}
+
+
+def is_authorized(token: Optional[str]) -> bool:
+    if not PROFILE_ADMIN_TOKEN or token is None:
+        return False
+    # constant-time: this token gates stack dumps of production requests
+    return hmac.compare_digest(token.encode("utf-8"), PROFILE_ADMIN_TOKEN.encode("utf-8"))
+
+
+# --------------------------------------------------
+# Stack sampling
+# --------------------------------------------------
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(PROJECT_ROOT):
+        filename = os.path.relpath(filename, PROJECT_ROOT)
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def _walk(frame):
+    """
+    Returns (labels root → leaf, touches app code, leaf is waiting).
+    """
+    labels = []
+    in_app = False
+    leaf_waiting = os.path.basename(frame.f_code.co_filename) in _WAIT_MODULES
+    while frame is not None:
+        code = frame.f_code
+        if code.co_filename.startswith(APP_ROOT):
+            in_app = True
+        labels.append(_frame_label(code))
+        frame = frame.f_back
+    labels.reverse()
+    return labels, in_app, leaf_waiting
+
+
+class _Sampler(threading.Thread):
+    """
+    Samples the event loop thread and any worker thread running app code.
+
+    Each tick is classified as CPU if some relevant thread is executing,
+    or I/O wait if they're all blocked on sockets/locks or the loop is idle
+    (i.e. the request's coroutine is suspended on an upstream call).
+    Other requests in flight at the same time can show up in the samples.
+    """
+
+    def __init__(self, loop_thread_id: int, interval: float):
+        super().__init__(daemon=True, name="request-profiler")
+        self.loop_thread_id = loop_thread_id
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.stacks: Counter = Counter()
+        self.cpu_ticks = 0
+        self.io_ticks = 0
+
+    def run(self):
+        own_id = threading.get_ident()
+        while not self.stop_event.wait(self.interval):
+            self._sample(own_id)
+
+    def _sample(self, own_id: int):
+        busy = False
+        seen = False
+
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            labels, in_app, waiting = _walk(frame)
+            if not in_app:
+                continue
+
+            seen = True
+            kind = "io" if waiting else "cpu"
+            busy = busy or kind == "cpu"
+            thread = "event_loop" if thread_id == self.loop_thread_id else "worker"
+            self.stacks[";".join([kind, thread] + labels)] += 1
+
+        if not seen:
+            self.stacks["io;event_loop;<awaiting I/O>"] += 1
+
+        if busy:
+            self.cpu_ticks += 1
+        else:
+            self.io_ticks += 1
+
+
+# --------------------------------------------------
+# Profile artifacts
+# --------------------------------------------------
+class RequestProfile:
+    def __init__(self, method: str, path: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.status: Optional[int] = None
+        self.created_at = datetime.utcnow()
+        self._sampler = _Sampler(threading.get_ident(), PROFILE_INTERVAL_MS / 1000)
+        self._wall_start = 0.0
+        self._cpu_start = 0.0
+        self.wall_seconds = 0.0
+        self.process_cpu_seconds = 0.0
+
+    def start(self):
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self._sampler.start()
+
+    def stop(self):
+        self._sampler.stop_event.set()
+        self._sampler.join()
+        self.wall_seconds = time.perf_counter() - self._wall_start
+        self.process_cpu_seconds = time.process_time() - self._cpu_start
+
+    def collapsed(self) -> str:
+        """
+        Brendan Gregg collapsed-stack format (flamegraph.pl / speedscope).
+        Stacks are prefixed with cpu|io and the thread kind.
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self._sampler.stacks.most_common())
+
+    def summary(self) -> dict:
+        ticks = self._sampler.cpu_ticks + self._sampler.io_ticks
+        cpu_share = self._sampler.cpu_ticks / ticks if ticks else 0.0
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "wall_ms": round(self.wall_seconds * 1000, 2),
+            "samples": ticks,
+            "cpu_ms_estimate": round(self.wall_seconds * cpu_share * 1000, 2),
+            "io_wait_ms_estimate": round(self.wall_seconds * (1 - cpu_share) * 1000, 2),
+            "process_cpu_ms": round(self.process_cpu_seconds * 1000, 2),
+        }
+
+
+PROFILE_STORE: "OrderedDict[str, RequestProfile]" = OrderedDict()
+_store_lock = threading.Lock()
+
+
+def save_profile(profile: RequestProfile):
+    with _store_lock:
+        PROFILE_STORE[profile.id] = profile
+        while len(PROFILE_STORE) > PROFILE_MAX_STORED:
+            PROFILE_STORE.popitem(last=False)
+
+    if PROFILE_DIR:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        with open(os.path.join(PROFILE_DIR, f"{profile.id}.collapsed"), "w") as f:
+            f.write(profile.collapsed())
+
+
+def get_profile(profile_id: str) -> Optional[RequestProfile]:
+    return PROFILE_STORE.get(profile_id)
+
+
+def list_profiles() -> list:
+    with _store_lock:
+        profiles = list(PROFILE_STORE.values())
+    return [p.summary() for p in reversed(profiles)]
+
+
+# --------------------------------------------------
+# ASGI middleware
+# --------------------------------------------------
+def _should_profile(headers: Dict[bytes, bytes]) -> bool:
+    token = headers.get(PROFILE_HEADER)
+    if token is not None and is_authorized(token.decode("latin-1")):
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a request when it carries the admin token header or is picked
+    by PROFILE_SAMPLE_RATE. The response gets an X-Profile-Id header;
+    fetch the artifact from /profiles/{id}.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (PROFILE_ADMIN_TOKEN or PROFILE_SAMPLE_RATE):
+            await self.app(scope, receive, send)
+            return
+
+        if not _should_profile(dict(scope["headers"])):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"])
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile.id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profile.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.stop()
+            save_profile(profile)
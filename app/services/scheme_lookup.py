@@ -1,16 +1,68 @@
-import httpx
-from rapidfuzz import process, fuzz
+import asyncio
+import logging
+import os
+import time
 
-MFAPI_LIST_URL = "https://api.mfapi.in/mf"
+from .metrics import record_cache_lookup
+from .mfapi import mfapi_get_json
+
+logger = logging.getLogger(__name__)
+
+# The master list changes a few times a day at most.
+SCHEME_LIST_TTL_SECONDS = float(os.getenv("SCHEME_LIST_TTL_SECONDS", str(12 * 3600)))
+
+_scheme_list = None
+_scheme_list_fetched_at = 0.0
+_scheme_list_lock = asyncio.Lock()
+_scheme_list_refresh = None
 
 async def get_all_schemes():
-    async with httpx.AsyncClient(timeout=20) as client:
-        resp = await client.get(MFAPI_LIST_URL)
-        resp.raise_for_status()
-        return resp.json()
+    return await mfapi_get_json("/mf", "scheme_list")
+
+async def _refresh_scheme_list():
+    global _scheme_list, _scheme_list_fetched_at
+
+    async with _scheme_list_lock:
+        # another request may have refreshed it while we waited
+        if _scheme_list is None or time.monotonic() - _scheme_list_fetched_at >= SCHEME_LIST_TTL_SECONDS:
+            _scheme_list = await get_all_schemes()
+            _scheme_list_fetched_at = time.monotonic()
+        return _scheme_list
+
+def _refresh_in_background():
+    global _scheme_list_refresh
+
+    if _scheme_list_refresh is not None and not _scheme_list_refresh.done():
+        return
+
+    async def run():
+        try:
+            await _refresh_scheme_list()
+        except Exception as e:
+            logger.warning("scheme list refresh failed, serving cached copy: %s", e)
+
+    _scheme_list_refresh = asyncio.create_task(run())
+
+async def get_cached_schemes():
+    """
+    Master scheme list, fetched at most once per SCHEME_LIST_TTL_SECONDS.
+    Once we have a copy, an expired list is returned as-is while a single
+    background task refetches it, so mfapi outages never block lookups.
+    """
+    if _scheme_list is not None:
+        fresh = time.monotonic() - _scheme_list_fetched_at < SCHEME_LIST_TTL_SECONDS
+        record_cache_lookup("scheme_list", fresh)
+        if not fresh:
+            _refresh_in_background()
+        return _scheme_list
+
+    record_cache_lookup("scheme_list", False)
+    return await _refresh_scheme_list()
 
 async def find_scheme_code_by_name(name_query: str):
-    schemes = await get_all_schemes()
+    from rapidfuzz import process, fuzz
+
+    schemes = await get_cached_schemes()
 
     # Extract list of names for fuzzy matching
     names = [s["schemeName"] for s in schemes]
@@ -0,0 +1,194 @@
+import asyncio
+import os
+import re
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from .metrics import record_cache_lookup
+from .scheme_lookup import get_cached_schemes
+
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "2048"))
+# Above this many index candidates, only the first N are fuzzy re-ranked.
+MAX_RERANK = 500
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_IDCW_WORDS = {"idcw", "dividend", "payout", "reinvestment", "bonus"}
+
+REGULAR = 1
+IDCW = 2
+
+
+def normalize(text: str) -> str:
+    return _NON_ALNUM.sub(" ", text.lower()).strip()
+
+
+# --------------------------------------------------
+# Prebuilt token index
+# --------------------------------------------------
+class SchemeIndex:
+    """
+    Inverted index over normalised scheme-name tokens.
+
+    Every query token is treated as a prefix of a vocabulary word (found
+    by bisecting the sorted vocabulary); a token with no prefix match is
+    mapped to its closest vocabulary words instead, so typos still narrow
+    the search. The rarest token picks the candidate set, the others
+    filter it, and only the survivors are fuzzy re-ranked.
+    """
+
+    def __init__(self, schemes: List[dict]):
+        # Shorter names first: when a short prefix matches thousands of
+        # schemes, the re-rank cap keeps the plainest names.
+        entries = sorted(
+            ((normalize(s.get("schemeName") or ""), s) for s in schemes),
+            key=lambda e: (len(e[0]), e[0]),
+        )
+
+        self.codes: List[str] = []
+        self.names: List[str] = []
+        self.normalized: List[str] = []
+        self.tokens: List[tuple] = []
+        self.flags = bytearray()
+        postings: Dict[str, array] = {}
+
+        for norm, s in entries:
+            tokens = tuple(sys.intern(t) for t in dict.fromkeys(norm.split()))
+            idx = len(self.codes)
+
+            self.codes.append(str(s["schemeCode"]))
+            self.names.append(s.get("schemeName") or "")
+            self.normalized.append(norm)
+            self.tokens.append(tokens)
+
+            flags = 0
+            if "regular" in tokens:
+                flags |= REGULAR
+            if _IDCW_WORDS.intersection(tokens):
+                flags |= IDCW
+            self.flags.append(flags)
+
+            for t in tokens:
+                postings.setdefault(t, array("i")).append(idx)
+
+        self.vocab = sorted(postings)
+        self.postings = [postings[t] for t in self.vocab]
+        self.word_vocab = [t for t in self.vocab if not t.isdigit()]
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _matching_words(self, token: str) -> List[int]:
+        """
+        Vocabulary positions for words starting with `token`,
+        or for the closest words when there are none.
+        """
+        lo = bisect_left(self.vocab, token)
+        hi = bisect_left(self.vocab, token + "\uffff", lo)
+        if lo < hi or token.isdigit() or len(token) < 3:
+            return list(range(lo, hi))
+
+        from rapidfuzz import fuzz, process
+
+        close = process.extract(token, self.word_vocab, scorer=fuzz.ratio, limit=3, score_cutoff=70)
+        return [bisect_left(self.vocab, word) for word, _, _ in close]
+
+    def candidates(self, query_tokens: List[str]) -> List[int]:
+        matchers = []
+        for tok in query_tokens:
+            words = self._matching_words(tok)
+            if not words:
+                return []
+            # selectivity estimate; capped so a 1-letter prefix stays cheap
+            size = sum(len(self.postings[i]) for i in words[:64])
+            matchers.append((size, words))
+
+        matchers.sort(key=lambda m: m[0])
+        seed = set()
+        for i in matchers[0][1]:
+            seed.update(self.postings[i])
+
+        others = [{self.vocab[i] for i in words} for _, words in matchers[1:]]
+        if not others:
+            return sorted(seed)
+
+        return sorted(
+            idx for idx in seed
+            if all(not allowed.isdisjoint(self.tokens[idx]) for allowed in others)
+        )
+
+    def search(self, query: str, k: int = 10, exclude_flags: int = 0) -> List[dict]:
+        from rapidfuzz import fuzz, process
+
+        norm = normalize(query)
+        if not norm:
+            return []
+
+        idxs = self.candidates(norm.split())
+        if exclude_flags:
+            idxs = [i for i in idxs if not self.flags[i] & exclude_flags]
+        if not idxs:
+            return []
+
+        choices = {i: self.normalized[i] for i in idxs[:MAX_RERANK]}
+        matches = process.extract(norm, choices, scorer=fuzz.WRatio, limit=k)
+
+        return [
+            {"scheme_code": self.codes[i], "scheme_name": self.names[i], "score": round(score, 2)}
+            for _, score, i in matches
+        ]
+
+
+# --------------------------------------------------
+# Process-level index + hot-prefix cache
+# --------------------------------------------------
+_index: Optional[SchemeIndex] = None
+_index_source = None
+_index_lock = asyncio.Lock()
+
+_results: "OrderedDict[tuple, List[dict]]" = OrderedDict()
+_results_lock = threading.Lock()
+
+
+async def get_scheme_index() -> SchemeIndex:
+    """
+    Rebuilt (off the event loop) whenever the cached master list changes.
+    """
+    global _index, _index_source
+
+    schemes = await get_cached_schemes()
+    if _index is not None and _index_source is schemes:
+        return _index
+
+    async with _index_lock:
+        if _index is None or _index_source is not schemes:
+            _index = await asyncio.to_thread(SchemeIndex, schemes)
+            _index_source = schemes
+            with _results_lock:
+                _results.clear()
+        return _index
+
+
+async def search_schemes(query: str, k: int = 10, hide_regular: bool = False, hide_idcw: bool = False) -> List[dict]:
+    index = await get_scheme_index()
+    exclude = (REGULAR if hide_regular else 0) | (IDCW if hide_idcw else 0)
+    key = (normalize(query), k, exclude)
+
+    with _results_lock:
+        cached = _results.get(key)
+        if cached is not None:
+            _results.move_to_end(key)
+    record_cache_lookup("scheme_search", cached is not None)
+    if cached is not None:
+        return cached
+
+    results = index.search(query, k, exclude)
+
+    with _results_lock:
+        _results[key] = results
+        while len(_results) > SEARCH_CACHE_SIZE:
+            _results.popitem(last=False)
+    return results
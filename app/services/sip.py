@@ -1,19 +1,17 @@
-import httpx
-from datetime import datetime
+import asyncio
+from datetime import date
+from typing import List
 from math import pow
-from ..schemas import SIPInput, SIPResult
-
-MFAPI_BASE = "https://api.mfapi.in"
+from ..schemas import SIPInput, SIPResult, SIPRollingReturns
+from .mfapi import mfapi_get_json
+from .nav_cache import NAV_CACHE, get_nav_series
 
 
 # --------------------------------------------------
 # Fetch full scheme data (metadata + NAV history)
 # --------------------------------------------------
 async def fetch_scheme_full(scheme_code: str):
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        resp = await client.get(f"{MFAPI_BASE}/mf/{scheme_code}")
-        resp.raise_for_status()
-        return resp.json()
+    return await mfapi_get_json(f"/mf/{scheme_code}", "scheme")
 
 
 # --------------------------------------------------
@@ -37,16 +35,102 @@ def calculate_sip_formula(monthly_amount: float, years: float, expected_return:
     return invested, fv
 
 
+def sip_formula_xirr_percent(monthly_amount: float, years: float, final_value: float) -> float:
+    """
+    XIRR of the formula-mode schedule: one instalment at the start of each
+    month, valued at the end of the last month.
+    """
+    import numpy as np
+    from .xirr import xirr_batch
+
+    n = int(years * 12)
+    if n <= 0 or monthly_amount <= 0:
+        return 0.0
+
+    times = np.arange(n + 1) / 12
+    amounts = np.full(n + 1, -float(monthly_amount), dtype=np.float64)
+    amounts[-1] = final_value
+    rate = xirr_batch(times[None, :], amounts[None, :])[0]
+    return 0.0 if np.isnan(rate) else float(rate * 100)
+
+
+# --------------------------------------------------
+# Sensitivity grid (formula mode, vectorised)
+# --------------------------------------------------
+def calculate_sip_grid(
+    monthly_amounts: List[float],
+    years: List[float],
+    expected_returns: List[float],
+    annual_step_up_percent: float = 0.0,
+    lumpsum_amount: float = 0.0,
+) -> dict:
+    """
+    Formula-mode SIP over the full amounts × years × returns grid.
+
+    Same schedule as calculate_sip_formula (instalment at the start of
+    each month, monthly compounding), plus an optional lumpsum at month 0
+    and an instalment that steps up by annual_step_up_percent every 12
+    months. Per unit of monthly amount, year j contributes
+    (1+s)^j × [sum_{k=1..12} (1+r)^k] × (1+r)^(n - 12(j+1)), so the
+    whole grid is one broadcast over (years, step-up year, rate) that
+    is scaled by the amounts at the end. Sums are taken term by term
+    rather than via closed forms, so r = 0 or (1+r)^12 = 1+s need no
+    special cases. Inputs are range-checked by SIPGridInput.
+    """
+    import numpy as np
+
+    amounts = np.asarray(monthly_amounts, dtype=np.float64)
+    months = (np.asarray(years, dtype=np.float64) * 12).astype(np.int64)
+    r = np.asarray(expected_returns, dtype=np.float64) / 12 / 100
+    step = 1 + annual_step_up_percent / 100
+
+    full_years, rem = np.divmod(months, 12)  # (Y,)
+
+    # annuity[q, i] = sum_{k=1..q} (1 + r_i)^k, q = 0..12
+    powers = (1 + r)[None, :] ** np.arange(13)[:, None]  # (13, R)
+    annuity = np.vstack([np.zeros_like(r), np.cumsum(powers[1:], axis=0)])
+
+    j = np.arange(max(int(full_years.max()), 1))
+    active = j[None, :] < full_years[:, None]  # (Y, J)
+    step_j = np.where(active, step ** j[None, :], 0.0)  # (Y, J)
+    # months left after the end of year j; masked years contribute 0 anyway
+    after = np.maximum(months[:, None] - 12 * (j[None, :] + 1), 0)  # (Y, J)
+    growth_after = (1 + r)[None, None, :] ** after[:, :, None]  # (Y, J, R)
+
+    last_step = step ** full_years  # instalment level in the partial year
+    per_unit = (
+        annuity[12][None, :] * (step_j[:, :, None] * growth_after).sum(axis=1)
+        + last_step[:, None] * annuity[rem]  # (Y, R)
+    )
+    per_unit_invested = 12 * step_j.sum(axis=1) + rem * last_step  # (Y,)
+
+    lumpsum_fv = lumpsum_amount * (1 + r)[None, :] ** months[:, None]  # (Y, R)
+    future_value = amounts[:, None, None] * per_unit[None] + lumpsum_fv[None]  # (A, Y, R)
+    invested = amounts[:, None] * per_unit_invested[None, :] + lumpsum_amount  # (A, Y)
+
+    profit = future_value - invested[:, :, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        absolute = np.where(invested[:, :, None] > 0, profit / invested[:, :, None] * 100, 0.0)
+
+    return {
+        "future_value": np.round(future_value, 2).tolist(),
+        "total_invested": np.round(invested, 2).tolist(),
+        "profit": np.round(profit, 2).tolist(),
+        "absolute_return_percent": np.round(absolute, 2).tolist(),
+        # every cashflow compounds at r, so XIRR is just the effective annual rate
+        "annual_return_percent": np.round(((1 + r) ** 12 - 1) * 100, 2).tolist(),
+    }
+
+
 # --------------------------------------------------
 # NAV-based SIP calculation (real market simulation)
 # --------------------------------------------------
 async def calculate_sip_nav_based(payload: SIPInput) -> SIPResult:
-    scheme_data = await fetch_scheme_full(payload.scheme_code)
+    series = await get_nav_series(payload.scheme_code)
 
-    meta = scheme_data.get("meta", {})
-    nav_history = scheme_data.get("data", [])
+    meta = series.meta
 
-    if not nav_history:
+    if not len(series):
         raise ValueError("No NAV history available for this scheme.")
 
     # Extract metadata
@@ -54,9 +138,7 @@ async def calculate_sip_nav_based(payload: SIPInput) -> SIPResult:
     scheme_category = meta.get("scheme_category", "Unknown Category")
     scheme_type = meta.get("scheme_type", "Unknown Type")
 
-    # NAV history: reverse to oldest → newest
-    nav_history.reverse()
-
+    # NAV series is already oldest → newest
     monthly_amount = payload.monthly_amount
     invest_months = int(payload.years * 12)
     sip_day = payload.sip_day
@@ -65,36 +147,39 @@ async def calculate_sip_nav_based(payload: SIPInput) -> SIPResult:
     total_invested = 0.0
 
     month_counter = 0
-    latest_nav = float(nav_history[-1]["nav"])
+    latest_nav = series.latest_nav
+    buy_ordinals = []
 
-    for entry in nav_history:
+    for ordinal, nav_value in zip(series.ordinals, series.navs):
         if month_counter >= invest_months:
             break
 
-        date_str = entry["date"]  # e.g. "01-01-2025"
-        nav_date = datetime.strptime(date_str, "%d-%m-%Y")
-
         # Buy only on SIP day
-        if nav_date.day != sip_day:
+        if date.fromordinal(ordinal).day != sip_day:
             continue
 
-        nav_value = float(entry["nav"])
         units = monthly_amount / nav_value
 
         total_units += units
         total_invested += monthly_amount
         month_counter += 1
+        buy_ordinals.append(ordinal)
 
     current_value = total_units * latest_nav
     profit = current_value - total_invested
 
     absolute_return = (profit / total_invested * 100) if total_invested else 0
 
-    annual_return = (
-        (pow((current_value / total_invested), (1 / payload.years)) - 1) * 100
-        if total_invested > 0 and payload.years > 0
-        else 0
-    )
+    # XIRR over the actual instalment dates, valued at the latest NAV date
+    annual_return = 0.0
+    if buy_ordinals:
+        from .xirr import xirr_from_ordinals
+
+        rate = xirr_from_ordinals(
+            buy_ordinals + [series.ordinals[-1]],
+            [-monthly_amount] * len(buy_ordinals) + [current_value],
+        )
+        annual_return = rate * 100 if rate is not None else 0.0
 
     return SIPResult(
         scheme_name=scheme_name,
@@ -107,4 +192,51 @@ async def calculate_sip_nav_based(payload: SIPInput) -> SIPResult:
         annual_return_percent=round(annual_return, 2),
         total_units=round(total_units, 4),
         latest_nav=round(latest_nav, 2),
+        stale=NAV_CACHE.is_stale(series),
+    )
+
+
+# --------------------------------------------------
+# Rolling SIP returns (batched XIRR)
+# --------------------------------------------------
+def _rolling_summary(series, months: int, lookback_years: int) -> dict:
+    import numpy as np
+    from .nav_stats import rolling_sip_xirr
+
+    ordinals, navs = series.as_arrays()
+
+    returns = rolling_sip_xirr(ordinals, navs, months, lookback_years)
+    returns = returns[np.isfinite(returns)]
+    if not len(returns):
+        raise ValueError("Not enough NAV history for this SIP duration.")
+
+    p25, median, p75 = np.percentile(returns, [25, 50, 75])
+    return {
+        "windows": int(len(returns)),
+        "min_percent": round(float(returns.min()), 2),
+        "p25_percent": round(float(p25), 2),
+        "median_percent": round(float(median), 2),
+        "p75_percent": round(float(p75), 2),
+        "max_percent": round(float(returns.max()), 2),
+        "positive_percent": round(float((returns > 0).mean() * 100), 2),
+    }
+
+
+async def calculate_rolling_sip_returns(scheme_code: str, months: int, lookback_years: int) -> SIPRollingReturns:
+    """
+    XIRR of every `months`-long SIP started within the last
+    `lookback_years`, summarised as a distribution.
+    """
+    series = await get_nav_series(scheme_code)
+    if len(series) < 2:
+        raise ValueError("No NAV history available for this scheme.")
+
+    summary = await asyncio.to_thread(_rolling_summary, series, months, lookback_years)
+    return SIPRollingReturns(
+        scheme_code=series.scheme_code,
+        scheme_name=series.meta.get("scheme_name", "Unknown Fund"),
+        months=months,
+        lookback_years=lookback_years,
+        stale=NAV_CACHE.is_stale(series),
+        **summary,
     )
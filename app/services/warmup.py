@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# component -> "pending" | "ok" | "error: ..."
+WARMUP_STATUS = {
+    "db": "pending",
+    "fuzzy_matcher": "pending",
+    "numpy": "pending",
+    "scheme_index": "pending",
+    "llm": "pending",
+}
+
+# Components the app cannot serve traffic without.
+# The LLM is best effort: chat already degrades gracefully if it's down.
+REQUIRED_COMPONENTS = ("db",)
+
+# Optional steps (LLM client, mfapi scheme list) stop holding readiness
+# after this long; they keep running and update their status when done.
+WARMUP_OPTIONAL_TIMEOUT_SECONDS = float(os.getenv("WARMUP_OPTIONAL_TIMEOUT_SECONDS", "15"))
+
+_background_steps = set()
+
+
+def _init_db():
+    from ..db import Base, engine
+    from .. import models  # noqa: F401  (registers tables on Base)
+
+    Base.metadata.create_all(bind=engine)
+
+
+def _import_fuzzy_matcher():
+    from rapidfuzz import process, fuzz  # noqa: F401
+
+
+def _import_numpy():
+    from . import nav_stats  # noqa: F401
+
+
+async def _build_scheme_index():
+    from .scheme_search import get_scheme_index
+
+    await get_scheme_index()
+
+
+def _warm_llm():
+    from .llm_provider import warm_llm
+
+    warm_llm()
+
+
+WARMUP_STEPS = {
+    "db": _init_db,
+    "fuzzy_matcher": _import_fuzzy_matcher,
+    "numpy": _import_numpy,
+    "scheme_index": _build_scheme_index,
+    "llm": _warm_llm,
+}
+
+
+async def _run_step(name: str, fn):
+    try:
+        if asyncio.iscoroutinefunction(fn):
+            await fn()
+        else:
+            await asyncio.to_thread(fn)
+        WARMUP_STATUS[name] = "ok"
+    except Exception as e:
+        logger.warning("warmup step %s failed: %s", name, e)
+        WARMUP_STATUS[name] = f"error: {e}"
+
+
+async def _run_bounded(name: str, fn):
+    """
+    Required steps run to completion. Optional ones get
+    WARMUP_OPTIONAL_TIMEOUT_SECONDS; past that they are marked "slow" (so
+    readiness stops waiting on them) and finish in the background.
+    """
+    if name in REQUIRED_COMPONENTS:
+        await _run_step(name, fn)
+        return
+
+    step = asyncio.ensure_future(_run_step(name, fn))
+    try:
+        await asyncio.wait_for(asyncio.shield(step), WARMUP_OPTIONAL_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        logger.warning("warmup step %s still running after %gs", name, WARMUP_OPTIONAL_TIMEOUT_SECONDS)
+        if WARMUP_STATUS[name] == "pending":
+            WARMUP_STATUS[name] = f"slow: still running after {WARMUP_OPTIONAL_TIMEOUT_SECONDS:g}s"
+        _background_steps.add(step)
+        step.add_done_callback(_background_steps.discard)
+
+
+async def run_warmup():
+    """
+    Runs every warmup step in parallel and off the event loop (async steps
+    only await I/O), so the server starts accepting (liveness) requests
+    immediately.
+    """
+    await asyncio.gather(
+        *(_run_bounded(name, fn) for name, fn in WARMUP_STEPS.items())
+    )
+
+
+def is_ready() -> bool:
+    """
+    Ready once every step has finished and the required ones succeeded.
+    """
+    if any(status == "pending" for status in WARMUP_STATUS.values()):
+        return False
+    return all(WARMUP_STATUS[name] == "ok" for name in REQUIRED_COMPONENTS)
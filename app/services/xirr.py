@@ -0,0 +1,105 @@
+from datetime import date
+from typing import Optional, Sequence
+
+import numpy as np
+
+# Search bracket for the annual rate: -99.99% … +1000%.
+_LOG_LO = np.log(1e-4)
+_LOG_HI = np.log(11.0)
+
+
+def xirr_batch(
+    times: np.ndarray,
+    amounts: np.ndarray,
+    tol: float = 1e-10,
+    max_iter: int = 100,
+) -> np.ndarray:
+    """
+    Annual XIRR for many cashflow series at once.
+
+    times:   (S, N) years since each series' first cashflow
+    amounts: (S, N) signed cashflows (outflows negative); pad with 0
+
+    Solves sum_i a_i * exp(x * (T - t_i)) = 0 for x = ln(1 + r) with
+    safeguarded Newton: a per-series bracket is kept, and any step that
+    leaves it (or isn't finite) is replaced by bisection. Every iteration
+    is a couple of (S, N) array ops, so thousands of series cost about
+    the same Python overhead as one.
+
+    Returns r per series (e.g. 0.12 for 12%), NaN where the cashflows
+    don't change sign.
+    """
+    times = np.atleast_2d(np.asarray(times, dtype=np.float64))
+    amounts = np.atleast_2d(np.asarray(amounts, dtype=np.float64))
+
+    # scale each series to unit size; the root doesn't change
+    scale = np.abs(amounts).max(axis=1, keepdims=True)
+    amounts = amounts / np.where(scale > 0, scale, 1.0)
+
+    # Value everything at each series' last date rather than its first:
+    # same root, but for the usual "pay in, redeem at the end" shape the
+    # function is concave and Newton no longer overshoots on losses.
+    horizon = times.max(axis=1, keepdims=True) - times
+
+    def npv(x):
+        disc = amounts * np.exp(x[:, None] * horizon)
+        return disc.sum(axis=1), (disc * horizon).sum(axis=1)
+
+    n = amounts.shape[0]
+    lo = np.full(n, _LOG_LO)
+    hi = np.full(n, _LOG_HI)
+    f_lo, _ = npv(lo)
+    f_hi, _ = npv(hi)
+    valid = np.sign(f_lo) * np.sign(f_hi) < 0
+
+    x = np.clip(_initial_guess(times, amounts), lo + 1e-6, hi - 1e-6)
+    for _ in range(max_iter):
+        f, df = npv(x)
+
+        # shrink the bracket around the root
+        same_side = np.sign(f) == np.sign(f_lo)
+        lo = np.where(same_side, x, lo)
+        hi = np.where(same_side, hi, x)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = x - f / df
+        bisect = ~np.isfinite(step) | (step < lo) | (step > hi)
+        x_new = np.where(bisect, (lo + hi) / 2, step)
+
+        done = np.abs(x_new - x) < tol
+        x = x_new
+        if done[valid].all():
+            break
+
+    return np.where(valid, np.expm1(x), np.nan)
+
+
+def _initial_guess(times: np.ndarray, amounts: np.ndarray) -> np.ndarray:
+    """
+    Exact answer if all inflows and all outflows were each collapsed to
+    their amount-weighted mean date; usually a few Newton steps away.
+    """
+    pos = np.where(amounts > 0, amounts, 0.0)
+    neg = np.where(amounts < 0, -amounts, 0.0)
+    p, q = pos.sum(axis=1), neg.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        span = (pos * times).sum(axis=1) / p - (neg * times).sum(axis=1) / q
+        guess = np.log(p / q) / span
+    return np.where(np.isfinite(guess), guess, np.log(1.1))
+
+
+def xirr(dates: Sequence[date], amounts: Sequence[float]) -> Optional[float]:
+    """
+    XIRR of one dated cashflow series, as a fraction (0.12 = 12% p.a.).
+    """
+    if not dates:
+        return None
+    ordinals = np.array([d.toordinal() for d in dates], dtype=np.float64)
+    return xirr_from_ordinals(ordinals, amounts)
+
+
+def xirr_from_ordinals(ordinals: Sequence[float], amounts: Sequence[float]) -> Optional[float]:
+    ordinals = np.asarray(ordinals, dtype=np.float64)
+    times = (ordinals - ordinals.min()) / 365.0
+    result = xirr_batch(times[None, :], np.asarray(amounts, dtype=np.float64)[None, :])[0]
+    return None if np.isnan(result) else float(result)
@@ -0,0 +1,67 @@
+import json
+import platform
+import subprocess
+import time
+from typing import Dict, List
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(q / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+def summarize(suite: str, name: str, samples_s: List[float], wall_s: float = 0.0, errors: int = 0) -> Dict:
+    """
+    One result row. Every benchmark (load or micro) reports in this shape,
+    so two runs can be diffed with bench/compare.py.
+    """
+    values = sorted(s * 1000 for s in samples_s)
+    n = len(values)
+    return {
+        "suite": suite,
+        "name": name,
+        "n": n,
+        "errors": errors,
+        "throughput_per_s": round(n / wall_s, 2) if wall_s else None,
+        "mean_ms": round(sum(values) / n, 4) if n else 0.0,
+        "p50_ms": round(percentile(values, 50), 4),
+        "p90_ms": round(percentile(values, 90), 4),
+        "p99_ms": round(percentile(values, 99), 4),
+        "max_ms": round(values[-1], 4) if n else 0.0,
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def write_results(path: str, results: List[Dict], params: Dict):
+    doc = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "params": params,
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(doc, f, indent=2)
+
+
+def print_table(results: List[Dict]):
+    header = f"{'suite':<6} {'name':<36} {'n':>7} {'err':>4} {'rps':>9} {'p50':>9} {'p90':>9} {'p99':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        rps = f"{r['throughput_per_s']:.1f}" if r["throughput_per_s"] else "-"
+        print(
+            f"{r['suite']:<6} {r['name']:<36} {r['n']:>7} {r['errors']:>4} {rps:>9} "
+            f"{r['p50_ms']:>9.3f} {r['p90_ms']:>9.3f} {r['p99_ms']:>9.3f}"
+        )
@@ -0,0 +1,34 @@
+"""
+Compare two benchmark result files (from bench.load or bench.micro).
+
+    python -m bench.compare baseline.json candidate.json
+"""
+import argparse
+import json
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--metric", default="p50_ms", choices=["mean_ms", "p50_ms", "p90_ms", "p99_ms", "throughput_per_s"])
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        base = json.load(f)
+    with open(args.candidate) as f:
+        cand = json.load(f)
+
+    base_rows = {(r["suite"], r["name"]): r for r in base["results"]}
+    print(f"{args.metric}: {base['revision']} -> {cand['revision']}")
+    print(f"{'name':<40} {'baseline':>12} {'candidate':>12} {'change':>9}")
+    for row in cand["results"]:
+        old = base_rows.get((row["suite"], row["name"]))
+        if not old or not old[args.metric] or row[args.metric] is None:
+            continue
+        change = (row[args.metric] - old[args.metric]) / old[args.metric] * 100
+        print(f"{row['name']:<40} {old[args.metric]:>12.3f} {row[args.metric]:>12.3f} {change:>+8.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Mixed-load benchmark: runs the real app under uvicorn against local
+mfapi / Groq stubs and reports throughput and latency percentiles.
+
+    python -m bench.load --duration 30 --concurrency 32 --out bench_load.json
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import httpx
+
+from .common import print_table, summarize, write_results
+from .stubs import SyntheticMfapi, llm_stub, mfapi_stub
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def build_mix(scheme_codes):
+    """
+    (weight, name, method, path builder, body builder) per request type.
+    """
+    def pick_code():
+        return str(random.choice(scheme_codes))
+
+    return [
+        (20, "POST /emi/single", "POST", lambda: "/emi/single", lambda: {
+            "principal": random.randint(100000, 5000000),
+            "annual_rate": random.choice([8.5, 9.0, 10.5, 12.0]),
+            "tenure_months": random.choice([60, 120, 240]),
+        }),
+        (10, "POST /emi/multi", "POST", lambda: "/emi/multi", lambda: {
+            "loans": [
+                {"loan_type": "home", "principal": 3000000, "annual_rate": 8.5, "tenure_months": 240},
+                {"loan_type": "car", "principal": 600000, "annual_rate": 9.5, "tenure_months": 60},
+            ],
+            "monthly_income": 150000,
+        }),
+        (15, "POST /sip/calculate (nav)", "POST", lambda: "/sip/calculate", lambda: {
+            "scheme_code": pick_code(), "monthly_amount": 5000, "years": random.choice([3, 5, 10]),
+        }),
+        (5, "POST /sip/calculate (formula)", "POST", lambda: "/sip/calculate", lambda: {
+            "scheme_code": pick_code(), "monthly_amount": 5000, "years": 10, "use_nav_history": False,
+        }),
+        (20, "GET /funds/{code}", "GET", lambda: f"/funds/{pick_code()}", None),
+        (5, "POST /leads/", "POST", lambda: "/leads/", lambda: {
+            "name": "Bench User", "email": "bench@example.com", "income": random.randint(20000, 200000),
+        }),
+        (10, "GET /leads/", "GET", lambda: "/leads/", None),
+        (15, "POST /chat/", "POST", lambda: "/chat/", lambda: {
+            "message": random.choice([
+                "What EMI will I pay on a 15 lakh loan?",
+                "I want to start a SIP of 5000 for 10 years",
+                "What is a flexi cap fund?",
+            ]),
+        }),
+    ]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_app(port: int, env: dict, workdir: str) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir,  # keeps the benchmark's sqlite file out of the repo
+        env={**os.environ, "PYTHONPATH": REPO_ROOT, **env},
+    )
+
+
+async def wait_ready(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/readyz")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError("app did not become ready")
+
+
+async def run_load(base_url: str, mix, duration: float, concurrency: int, warmup: float):
+    weights = [m[0] for m in mix]
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    stop_at = time.monotonic() + warmup + duration
+    record_from = time.monotonic() + warmup
+
+    async def worker(client):
+        while time.monotonic() < stop_at:
+            _, name, method, path, body = random.choices(mix, weights)[0]
+            start = time.perf_counter()
+            try:
+                resp = await client.request(method, path(), json=body() if body else None)
+                ok = resp.status_code < 500
+            except httpx.HTTPError:
+                ok = False
+            elapsed = time.perf_counter() - start
+            if time.monotonic() >= record_from:
+                latencies[name].append(elapsed)
+                if not ok:
+                    errors[name] += 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+
+    results = [
+        summarize("load", name, latencies[name], duration, errors[name])
+        for _, name, *_ in mix
+    ]
+    all_samples = [s for v in latencies.values() for s in v]
+    results.append(summarize("load", "ALL", all_samples, duration, sum(errors.values())))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds before recording")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--schemes", type=int, default=5000, help="size of the scheme master list")
+    parser.add_argument("--history-days", type=int, default=3650, help="NAV history length per scheme")
+    parser.add_argument("--hot-schemes", type=int, default=50, help="schemes the load actually queries")
+    parser.add_argument("--mfapi-latency-ms", type=float, default=20.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="", help="write JSON results here")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    mfapi = SyntheticMfapi(args.schemes, args.history_days, args.seed)
+    codes = [s["schemeCode"] for s in mfapi.schemes[: args.hot_schemes]]
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+
+    with mfapi_stub(mfapi, args.mfapi_latency_ms) as mf, llm_stub(args.llm_latency_ms) as llm, \
+            tempfile.TemporaryDirectory() as workdir:
+        app = start_app(port, {
+            "MFAPI_BASE_URL": mf.url,
+            "GROQ_BASE_URL": llm.url,
+            "GROQ_API_KEY": "bench",
+            "LLM_PROVIDER": "groq",
+            "INTERNAL_BASE_URL": base_url,
+            "FUND_METRICS_REFRESH_SECONDS": "0",  # no background indexing during the run
+        }, workdir)
+        try:
+            asyncio.run(wait_ready(base_url))
+            results = asyncio.run(run_load(base_url, build_mix(codes), args.duration, args.concurrency, args.warmup))
+        finally:
+            app.terminate()
+            app.wait(timeout=10)
+
+    print_table(results)
+    if args.out:
+        write_results(args.out, results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Micro-benchmarks for the hot service functions, fed by the same
+synthetic data as the load benchmark (no network involved).
+
+    python -m bench.micro --out bench_micro.json
+"""
+import argparse
+import asyncio
+import time
+from unittest import mock
+
+from .common import print_table, summarize, write_results
+from .stubs import SyntheticMfapi
+
+
+def time_calls(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_sip_nav_based(mfapi: SyntheticMfapi, repeat: int, years: float, cached: bool = False):
+    from app.schemas import SIPInput
+    from app.services import sip
+    from app.services.nav_cache import NAV_CACHE
+
+    code = str(mfapi.schemes[0]["schemeCode"])
+    mfapi.scheme_body(code)
+    payload = SIPInput(scheme_code=code, monthly_amount=5000, years=years)
+
+    async def fetch(scheme_code):
+        # fresh dicts each call (JSON decode included), like a real HTTP response
+        return mfapi.scheme_json(scheme_code)
+
+    loop = asyncio.new_event_loop()
+
+    def call():
+        if not cached:
+            NAV_CACHE.clear()
+        loop.run_until_complete(sip.calculate_sip_nav_based(payload))
+
+    try:
+        with mock.patch.object(sip, "fetch_scheme_full", fetch):
+            call()
+            samples = time_calls(call, repeat)
+    finally:
+        loop.close()
+        NAV_CACHE.clear()
+    suffix = ",cached" if cached else ""
+    return summarize("micro", f"calculate_sip_nav_based[{years:g}y{suffix}]", samples)
+
+
+def bench_scheme_lookup(mfapi: SyntheticMfapi, repeat: int):
+    import json
+    from app.services import scheme_lookup
+
+    schemes = json.loads(mfapi.list_body)
+    queries = ["parag parikh flexi cap direct", "hdfc mid cap", "sbi liquid regular idcw", "axis small cap 12"]
+
+    async def get_all():
+        return schemes
+
+    loop = asyncio.new_event_loop()
+    i = 0
+
+    def call():
+        nonlocal i
+        i += 1
+        loop.run_until_complete(scheme_lookup.find_scheme_code_by_name(queries[i % len(queries)]))
+
+    try:
+        with mock.patch.object(scheme_lookup, "get_all_schemes", get_all):
+            call()  # first call pays the rapidfuzz import
+            samples = time_calls(call, repeat)
+    finally:
+        loop.close()
+    return summarize("micro", f"find_scheme_code_by_name[{len(schemes)}]", samples)
+
+
+def bench_scheme_search(mfapi: SyntheticMfapi, repeat: int):
+    import json
+    from app.services.scheme_search import SchemeIndex
+
+    index = SchemeIndex(json.loads(mfapi.list_body))
+    # one user typing, keystroke by keystroke (uncached path)
+    keystrokes = [q[:n] for q in ("parag parikh flexi", "hdfc mid cap direct", "sbi liqud") for n in range(1, len(q) + 1)]
+    i = 0
+
+    def call():
+        nonlocal i
+        i += 1
+        index.search(keystrokes[i % len(keystrokes)], 10, exclude_flags=3)
+
+    samples = time_calls(call, repeat)
+    return summarize("micro", f"SchemeIndex.search[{len(index)}]", samples)
+
+
+def bench_xirr_batch(repeat: int, series: int, months: int = 120):
+    import numpy as np
+    from app.services.xirr import xirr_batch
+
+    rng = np.random.default_rng(0)
+    times = np.tile(np.arange(months + 1) / 12, (series, 1))
+    amounts = np.full(times.shape, -1.0)
+    amounts[:, -1] = months * rng.lognormal(0.4, 0.4, series)  # -80% … +300% outcomes
+
+    xirr_batch(times, amounts)
+    samples = time_calls(lambda: xirr_batch(times, amounts), repeat)
+    return summarize("micro", f"xirr_batch[{series}x{months + 1}]", samples)
+
+
+def bench_goal_simulation(mfapi: SyntheticMfapi, repeat: int, paths: int, years: int = 15):
+    import numpy as np
+    from app.services.monte_carlo import monthly_returns, simulate_chunk, summarize_paths
+    from app.services.nav_cache import NavSeries
+
+    code = str(mfapi.schemes[0]["schemeCode"])
+    returns = monthly_returns([NavSeries.from_mfapi(code, mfapi.scheme_json(code))], [1.0])
+    months = years * 12
+    seeds = np.random.SeedSequence(0).spawn(paths // 10000 or 1)
+
+    def call():
+        values = np.concatenate(
+            [simulate_chunk(returns, 10000, 0, months, min(paths, 10000), s) for s in seeds], axis=1
+        )
+        summarize_paths(values, months, 5_000_000)
+
+    samples = time_calls(call, repeat)
+    return summarize("micro", f"goal_simulation[{paths}x{months}m]", samples)
+
+
+def bench_sip_grid(repeat: int, size: int):
+    from app.services.sip import calculate_sip_grid
+
+    amounts = [1000.0 * (i + 1) for i in range(size)]
+    years = [float(i + 1) for i in range(size)]
+    rates = [i / 2 for i in range(size)]
+    samples = time_calls(lambda: calculate_sip_grid(amounts, years, rates, 10.0, 50000.0), repeat)
+    return summarize("micro", f"calculate_sip_grid[{size}^3]", samples)
+
+
+def bench_multi_emi(repeat: int, loans: int):
+    from app.schemas import LoanInput
+    from app.services.emi import calculate_multi_emi
+
+    inputs = [
+        LoanInput(loan_type=f"loan{i}", principal=100000 + i * 5000, annual_rate=8 + i % 5, tenure_months=60 + i)
+        for i in range(loans)
+    ]
+    samples = time_calls(lambda: calculate_multi_emi(inputs, monthly_income=150000), repeat)
+    return summarize("micro", f"calculate_multi_emi[{loans}]", samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--schemes", type=int, default=5000)
+    parser.add_argument("--history-days", type=int, default=3650)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="", help="write JSON results here")
+    args = parser.parse_args()
+
+    mfapi = SyntheticMfapi(args.schemes, args.history_days, args.seed)
+    results = [
+        bench_sip_nav_based(mfapi, args.repeat, years=5),
+        bench_sip_nav_based(mfapi, args.repeat, years=10),
+        bench_sip_nav_based(mfapi, args.repeat, years=10, cached=True),
+        bench_scheme_lookup(mfapi, args.repeat),
+        bench_scheme_search(mfapi, args.repeat * 5),
+        bench_xirr_batch(args.repeat * 10, series=1),
+        bench_xirr_batch(max(1, args.repeat // 20), series=10000),
+        bench_goal_simulation(mfapi, args.repeat, paths=10000),
+        bench_goal_simulation(mfapi, max(1, args.repeat // 20), paths=100000),
+        bench_sip_grid(args.repeat, size=10),
+        bench_sip_grid(max(1, args.repeat // 10), size=50),
+        bench_multi_emi(args.repeat * 10, loans=3),
+        bench_multi_emi(args.repeat, loans=100),
+    ]
+
+    print_table(results)
+    if args.out:
+        write_results(args.out, results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
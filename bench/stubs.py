@@ -0,0 +1,210 @@
+"""
+Local stand-ins for api.mfapi.in and the Groq API.
+
+Both run on stdlib ThreadingHTTPServer so the benchmark has no network
+dependency and no extra packages. Responses are deterministic for a seed.
+"""
+import json
+import random
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CATEGORIES = [
+    "Equity Scheme - Flexi Cap Fund",
+    "Equity Scheme - Large Cap Fund",
+    "Equity Scheme - Mid Cap Fund",
+    "Equity Scheme - Small Cap Fund",
+    "Hybrid Scheme - Aggressive Hybrid Fund",
+    "Debt Scheme - Corporate Bond Fund",
+    "Debt Scheme - Liquid Fund",
+]
+AMCS = ["Axis", "HDFC", "ICICI Prudential", "Kotak", "Nippon India", "Parag Parikh", "SBI", "UTI"]
+# daily NAV volatility by category, so screener results look plausible
+DAILY_SIGMA = {"Liquid Fund": 0.0003, "Corporate Bond Fund": 0.002, "Aggressive Hybrid Fund": 0.007}
+PLANS = ["Direct Plan - Growth", "Regular Plan - Growth", "Direct Plan - IDCW", "Regular Plan - IDCW"]
+
+
+# --------------------------------------------------
+# Synthetic mfapi data
+# --------------------------------------------------
+class SyntheticMfapi:
+    def __init__(self, schemes: int = 2000, history_days: int = 3650, seed: int = 42, end: date = date(2025, 1, 31)):
+        self.history_days = history_days
+        self.seed = seed
+        self.end = end
+        rng = random.Random(seed)
+
+        self.schemes = []
+        for i in range(schemes):
+            category = CATEGORIES[i % len(CATEGORIES)]
+            label = category.split(" - ")[1]
+            name = f"{rng.choice(AMCS)} {label} {i} - {PLANS[i % len(PLANS)]}"
+            self.schemes.append({"schemeCode": 100000 + i, "schemeName": name, "category": category})
+
+        self.list_body = json.dumps(
+            [{"schemeCode": s["schemeCode"], "schemeName": s["schemeName"]} for s in self.schemes]
+        ).encode()
+        self._by_code = {str(s["schemeCode"]): s for s in self.schemes}
+        self._scheme_bodies = {}
+        self._lock = threading.Lock()
+
+    def scheme_body(self, code: str):
+        body = self._scheme_bodies.get(code)
+        if body is not None:
+            return body
+
+        scheme = self._by_code.get(code)
+        if scheme is None:
+            return None
+
+        rng = random.Random(f"{self.seed}-{code}")
+        sigma = DAILY_SIGMA.get(scheme["category"].split(" - ")[1], 0.01)
+        nav = 10.0
+        data = []
+        day = self.end - timedelta(days=self.history_days)
+        while day <= self.end:
+            if day.weekday() < 5:  # mfapi only publishes business-day NAVs
+                nav *= 1 + rng.gauss(0.0004, sigma)
+                data.append({"date": day.strftime("%d-%m-%Y"), "nav": f"{nav:.4f}"})
+            day += timedelta(days=1)
+        data.reverse()  # newest first, like mfapi
+
+        body = json.dumps({
+            "meta": {
+                "fund_house": scheme["schemeName"].split(" ")[0] + " Mutual Fund",
+                "scheme_type": "Open Ended Schemes",
+                "scheme_category": scheme["category"],
+                "scheme_code": scheme["schemeCode"],
+                "scheme_name": scheme["schemeName"],
+            },
+            "data": data,
+            "status": "SUCCESS",
+        }).encode()
+
+        with self._lock:
+            self._scheme_bodies[code] = body
+        return body
+
+    def latest_body(self, code: str):
+        body = self.scheme_body(code)
+        if body is None:
+            return None
+        doc = json.loads(body)
+        doc["data"] = doc["data"][:1]
+        return json.dumps(doc).encode()
+
+    def scheme_json(self, code: str) -> dict:
+        return json.loads(self.scheme_body(str(code)))
+
+
+# --------------------------------------------------
+# HTTP servers
+# --------------------------------------------------
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _mfapi_handler(mfapi: SyntheticMfapi, latency_s: float):
+    class Handler(_Handler):
+        def do_GET(self):
+            if latency_s:
+                time.sleep(latency_s)
+            path = self.path.rstrip("/")
+            if path == "/mf":
+                return self._reply(200, mfapi.list_body)
+            if path.startswith("/mf/") and path.endswith("/latest"):
+                body = mfapi.latest_body(path[len("/mf/"):-len("/latest")])
+                if body is not None:
+                    return self._reply(200, body)
+            elif path.startswith("/mf/"):
+                body = mfapi.scheme_body(path[len("/mf/"):])
+                if body is not None:
+                    return self._reply(200, body)
+            self._reply(404, b'{"status": "NOT_FOUND"}')
+
+    return Handler
+
+
+def _llm_reply(messages) -> str:
+    system = messages[0]["content"] if messages else ""
+    user = messages[-1]["content"] if messages else ""
+
+    if "JSON-only intent extractor" in system:
+        lowered = user.lower()
+        if "emi" in lowered or "loan" in lowered:
+            return json.dumps({"intent": "emi", "loan_amount": 1500000, "interest_rate": 9.5, "tenure_years": 15})
+        if "sip" in lowered:
+            return json.dumps({"intent": "sip", "monthly_amount": 5000, "years": 10})
+        return json.dumps({"intent": "general"})
+
+    return "Here is a short, friendly explanation from the benchmark LLM stub."
+
+
+def _groq_handler(latency_s: float):
+    """
+    Speaks just enough of Groq's OpenAI-compatible API for the groq SDK.
+    """
+    class Handler(_Handler):
+        def do_GET(self):
+            self._reply(200, b'{"object": "list", "data": []}')
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if latency_s:
+                time.sleep(latency_s)
+            body = json.dumps({
+                "id": "bench",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": payload.get("model", "stub"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": _llm_reply(payload.get("messages", []))},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            }).encode()
+            self._reply(200, body)
+
+    return Handler
+
+
+class StubServer:
+    def __init__(self, handler_cls, host: str = "127.0.0.1", port: int = 0):
+        self.server = ThreadingHTTPServer((host, port), handler_cls)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def mfapi_stub(mfapi: SyntheticMfapi, latency_ms: float = 0.0) -> StubServer:
+    return StubServer(_mfapi_handler(mfapi, latency_ms / 1000))
+
+
+def llm_stub(latency_ms: float = 0.0) -> StubServer:
+    return StubServer(_groq_handler(latency_ms / 1000))
@@ -1,3 +1,7 @@
 #!/bin/bash
 chmod +x start.sh
+# Railway's edge proxy appends the real client address to X-Forwarded-For;
+# without this every user shares the proxy's admission bucket.
+export ADMISSION_TRUST_FORWARDED="${ADMISSION_TRUST_FORWARDED:-1}"
+export ADMISSION_TRUSTED_HOPS="${ADMISSION_TRUSTED_HOPS:-1}"
 uvicorn app.main:app --host 0.0.0.0 --port $PORT